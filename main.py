@@ -4,6 +4,7 @@
 仪器读控一体化GUI应用程序主入口
 """
 
+import logging
 import sys
 import os
 from PySide6.QtWidgets import QApplication
@@ -58,6 +59,12 @@ from gui.main_window import MainWindow
 
 def main():
     """主函数"""
+    # 日志默认只输出警告和错误，调试日志可在"帮助"菜单中开启
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    
     # 创建应用程序实例
     app = QApplication(sys.argv)
     
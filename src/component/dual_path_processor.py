@@ -5,7 +5,9 @@
 实现双通道数据处理和噪声抑制
 """
 
+import math
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Tuple, Dict, List, Optional, Callable
 import threading
 from enum import Enum
@@ -64,7 +66,7 @@ class DualPathProcessor:
         self.difference_coefficient = 1.0  # 差值法系数
         self.smoothing_factor = 0.95      # 平滑因子
         
-        # LMS滤波器（可选）
+        # LMS滤波器（可选；属性总存在，不使用LMS的模式下为None）
         self.lms_filter = None
         if suppression_mode in [NoiseSuppressionMode.LMS_ADAPTIVE, NoiseSuppressionMode.HYBRID]:
             self.lms_filter = AdaptiveLMSFilter(
@@ -84,8 +86,11 @@ class DualPathProcessor:
             'processing_efficiency': 0.0
         }
         
-        # 线程安全
-        self._lock = threading.Lock()
+        # 指标版本号：处理样本、标定、重置或切换模式时递增，界面据此跳过指标未变的处理器
+        self.metrics_version = 0
+        
+        # 线程安全（可重入锁：process_sample 持锁时会调用 calibrate）
+        self._lock = threading.RLock()
         
         # 回调函数
         self.status_callback: Optional[Callable] = None
@@ -115,6 +120,7 @@ class DualPathProcessor:
         with self._lock:
             old_mode = self.suppression_mode
             self.suppression_mode = new_mode
+            self.metrics_version += 1
             
             # 根据新模式初始化或销毁LMS滤波器
             if new_mode in [NoiseSuppressionMode.LMS_ADAPTIVE, NoiseSuppressionMode.HYBRID]:
@@ -170,6 +176,7 @@ class DualPathProcessor:
                 
                 # 更新统计信息
                 self.statistics['correlation_coefficient'] = abs(correlation_coeff) if 'correlation_coeff' in locals() else 0.0
+                self.metrics_version += 1
                 
                 print(f"标定完成: 比值={self.calibration_ratio:.4f}, 差值系数={self.difference_coefficient:.4f}")
                 print(f"相关系数: {self.statistics['correlation_coefficient']:.3f}")
@@ -196,6 +203,7 @@ class DualPathProcessor:
         """
         with self._lock:
             self.sample_count += 1
+            self.metrics_version += 1
             
             # 添加到缓存
             self.main_buffer.append(main_signal)
@@ -229,6 +237,157 @@ class DualPathProcessor:
             
             return processed_signal, processing_info
     
+    def process_block(self, main_signals: np.ndarray, reference_signals: np.ndarray,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        批量处理一段信号样本
+        
+        结果与逐个调用process_sample相同，但整段只加锁一次：比值法、差值法等按数组运算，
+        LMS部分交给滤波器的batch_filter；统计信息在段末更新一次，不调用data_callback。
+        
+        参数:
+            main_signals (np.ndarray): 主信号数组
+            reference_signals (np.ndarray): 参考信号数组
+            out (np.ndarray, optional): 结果写入的数组，长度与输入相同；不提供时新建
+        
+        返回:
+            np.ndarray: 处理后信号数组
+        """
+        main_signals = np.asarray(main_signals, dtype=np.float64)
+        reference_signals = np.asarray(reference_signals, dtype=np.float64)
+        if len(main_signals) != len(reference_signals):
+            raise ValueError("主信号和参考信号长度必须相等")
+        
+        n = len(main_signals)
+        output = np.empty_like(main_signals) if out is None else out
+        if n == 0:
+            return output
+        
+        with self._lock:
+            # 自动标定发生在第calibration_samples个样本处，在该样本前后分段以保持与逐样本处理一致
+            bounds = [0, n]
+            calibration_index = self.calibration_samples - self.sample_count - 1
+            if self.enable_auto_calibration and 0 <= calibration_index < n:
+                bounds = sorted({0, calibration_index, calibration_index + 1, n})
+            
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                self._process_segment(main_signals[start:end], reference_signals[start:end],
+                                      output[start:end])
+        
+        return output
+    
+    def _process_segment(self, main_signals: np.ndarray, reference_signals: np.ndarray,
+                         output: np.ndarray):
+        """处理一段不跨越自动标定点的样本，结果写入output（调用方需持有锁）"""
+        n = len(main_signals)
+        
+        # 归一化比值法需要每个样本之前的最近9个样本
+        main_history = np.concatenate((self.main_buffer[-9:], main_signals))
+        reference_history = np.concatenate((self.reference_buffer[-9:], reference_signals))
+        buffer_lengths = np.minimum(len(self.main_buffer) + np.arange(1, n + 1), self.buffer_size)
+        
+        self.sample_count += n
+        self.metrics_version += 1
+        self.main_buffer.extend(main_signals.tolist())
+        self.reference_buffer.extend(reference_signals.tolist())
+        del self.main_buffer[:-self.buffer_size]
+        del self.reference_buffer[:-self.buffer_size]
+        
+        if (self.enable_auto_calibration and
+            len(self.main_buffer) == self.calibration_samples and
+            self.sample_count == self.calibration_samples):
+            self.calibrate(self.main_buffer, self.reference_buffer)
+        
+        processed, noise = self._process_block_by_mode(
+            main_signals, reference_signals, main_history, reference_history, buffer_lengths
+        )
+        
+        # 平滑滤波是一阶递推，逐个计算
+        smoothing = self.smoothing_factor
+        previous = self.output_buffer[-1] if self.output_buffer else None
+        for i, value in enumerate(processed.tolist()):
+            if previous is not None:
+                value = smoothing * previous + (1 - smoothing) * value
+            output[i] = previous = value
+        
+        self.noise_buffer.extend(noise.tolist())
+        del self.noise_buffer[:-self.buffer_size]
+        
+        # 统计信息只按段末样本更新一次
+        self.output_buffer.extend(output[:-1].tolist())
+        self._update_statistics(main_signals[-1], reference_signals[-1], output[-1])
+        self.output_buffer.append(output[-1].item())
+        del self.output_buffer[:-self.buffer_size]
+    
+    def _process_block_by_mode(self, main_signals: np.ndarray, reference_signals: np.ndarray,
+                               main_history: np.ndarray, reference_history: np.ndarray,
+                               buffer_lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        _process_by_mode的数组版本（不含平滑）
+        
+        返回:
+            Tuple[np.ndarray, np.ndarray]: (处理后信号数组, 噪声估计数组)
+        """
+        mode = self.suppression_mode
+        
+        if mode in (NoiseSuppressionMode.RATIO, NoiseSuppressionMode.HYBRID):
+            valid = np.abs(reference_signals) > 1e-12
+            ratio_result = np.where(
+                valid,
+                main_signals / np.where(valid, reference_signals, 1.0) * self.calibration_ratio,
+                main_signals
+            )
+        
+        if mode == NoiseSuppressionMode.RATIO:
+            processed = ratio_result
+            noise = main_signals - processed
+        
+        elif mode == NoiseSuppressionMode.NORMALIZED_RATIO:
+            n = len(main_signals)
+            processed = main_signals.copy()
+            if len(main_history) >= 10:
+                # 每个样本对应以它结尾的10点窗口
+                window_index = np.arange(n) + (len(main_history) - n) - 9
+                usable = (buffer_lengths > 10) & (window_index >= 0)
+                window_index = window_index[usable]
+                main_mean = sliding_window_view(main_history, 10).mean(axis=1)[window_index]
+                ref_mean = sliding_window_view(reference_history, 10).mean(axis=1)[window_index]
+                
+                usable_main = main_signals[usable]
+                usable_ref = reference_signals[usable]
+                valid = (np.abs(ref_mean) > 1e-12) & (np.abs(main_mean) > 1e-12)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    normalized_ref = usable_ref / ref_mean
+                    normalized_main = usable_main / main_mean
+                    ratio = np.where(np.abs(normalized_ref) > 1e-12,
+                                     normalized_main / normalized_ref, 1.0)
+                    processed[usable] = np.where(valid, usable_main / ratio, usable_main)
+            noise = main_signals - processed
+        
+        elif mode == NoiseSuppressionMode.DIFFERENCE:
+            noise = self.difference_coefficient * reference_signals
+            processed = main_signals - noise
+        
+        elif mode == NoiseSuppressionMode.LMS_ADAPTIVE:
+            if self.lms_filter is not None:
+                processed, noise = self.lms_filter.batch_filter(main_signals, reference_signals)
+            else:
+                processed = main_signals
+                noise = np.zeros_like(main_signals)
+        
+        elif mode == NoiseSuppressionMode.HYBRID:
+            if self.lms_filter is not None:
+                processed, _ = self.lms_filter.batch_filter(ratio_result, reference_signals)
+            else:
+                processed = ratio_result
+            noise = main_signals - processed
+        
+        else:
+            processed = main_signals
+            noise = np.zeros_like(main_signals)
+        
+        return processed, noise
+    
     def _process_by_mode(self, main_signal: float, reference_signal: float) -> Tuple[float, Dict]:
         """
         根据当前模式处理信号
@@ -333,10 +492,10 @@ class DualPathProcessor:
         recent_noise = self.noise_buffer[-9:] + [main_signal - processed_signal]
         
         # 计算SNR改善
-        main_std = np.std(recent_main)
-        processed_std = np.std(recent_processed)
+        main_std = np.std(recent_main).item()
+        processed_std = np.std(recent_processed).item()
         if main_std > 0 and processed_std > 0:
-            snr_improvement = 20 * np.log10(main_std / processed_std)
+            snr_improvement = 20.0 * math.log10(main_std / processed_std)
             self.statistics['snr_improvement'] = max(0, snr_improvement)
         
         # 计算噪声抑制比
@@ -390,6 +549,7 @@ class DualPathProcessor:
             self.noise_buffer.clear()
             
             self.sample_count = 0
+            self.metrics_version += 1
             self.calibration_ratio = 1.0
             self.difference_coefficient = 1.0
             
@@ -466,7 +626,7 @@ class MultiChannelProcessor:
         self.channel_roles: Dict[str, ChannelRole] = {}
         self.processing_graph: Dict[str, List[str]] = {}  # 处理图：主信号 -> 参考信号列表
         
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
         
         print("多通道处理器初始化完成")
     
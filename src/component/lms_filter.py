@@ -5,9 +5,14 @@ LMS自适应滤波器实现
 用于降低激光源光强抖动噪声
 """
 
+import logging
+import math
 import numpy as np
 from typing import Tuple, Optional
 import threading
+from .lms_kernels import lms_step, lms_block
+
+log = logging.getLogger(__name__)
 
 
 class LMSFilter:
@@ -43,8 +48,8 @@ class LMSFilter:
         self.error_power_history = []  # 误差功率历史
         self.convergence_factor = 0.95  # 收敛判定因子
         
-        # 线程安全锁
-        self._lock = threading.Lock()
+        # 线程安全锁（可重入：auto_adjust_parameters 持锁时会调用其他加锁方法）
+        self._lock = threading.RLock()
         
         # 统计信息
         self.sample_count = 0
@@ -95,45 +100,68 @@ class LMSFilter:
             Tuple[float, float]: (滤波后信号, 误差信号)
         """
         with self._lock:
-            # 更新参考信号缓存
-            self.reference_buffer = np.roll(self.reference_buffer, 1)
-            self.reference_buffer[0] = reference_signal
-            
-            # 计算滤波器输出（噪声估计）
-            noise_estimate = np.dot(self.weights, self.reference_buffer)
-            
-            # 计算误差信号（滤波后的主信号）
-            error_signal = main_signal - noise_estimate
-            
-            # 更新滤波器权重（LMS算法）
-            self.weights = self.leakage * self.weights + \
-                          self.step_size * error_signal * self.reference_buffer
-            
-            # 统计信息更新
-            self.sample_count += 1
-            error_power = error_signal ** 2
-            self.total_error_power += error_power
-            
-            # 记录适应过程
-            if self.sample_count % 10 == 0:  # 每10个样本记录一次
-                avg_error_power = self.total_error_power / self.sample_count
-                self.error_power_history.append(avg_error_power)
-                
-                # 计算噪声抑制效果
-                if len(self.error_power_history) > 10:
-                    initial_power = np.mean(self.error_power_history[:10])
-                    current_power = avg_error_power
-                    if current_power > 0 and initial_power > 0:
-                        self.noise_reduction_db = 10 * np.log10(initial_power / current_power)
-                        self.noise_reduction_db = max(0, self.noise_reduction_db)  # 确保非负
+            # 更新参考信号缓存、计算噪声估计和误差信号、更新权重（原地修改数组）
+            error_signal, noise_estimate = lms_step(
+                self.weights, self.reference_buffer,
+                float(main_signal), float(reference_signal),
+                float(self.step_size), float(self.leakage)
+            )
             
+            self._record_error(error_signal)
             return error_signal, noise_estimate
     
+    def _record_error(self, error_signal: float):
+        """更新误差统计和噪声抑制效果（调用方需持有锁）"""
+        self.sample_count += 1
+        error_power = error_signal ** 2
+        self.total_error_power += error_power
+        
+        # 记录适应过程
+        if self.sample_count % 10 == 0:  # 每10个样本记录一次
+            avg_error_power = self.total_error_power / self.sample_count
+            self.error_power_history.append(avg_error_power)
+            
+            # 计算噪声抑制效果
+            if len(self.error_power_history) > 10:
+                initial_power = np.mean(self.error_power_history[:10]).item()
+                current_power = avg_error_power
+                if current_power > 0 and initial_power > 0:
+                    self.noise_reduction_db = 10.0 * math.log10(initial_power / current_power)
+                    self.noise_reduction_db = max(0, self.noise_reduction_db)  # 确保非负
+    
+    def _record_errors(self, error_signals: np.ndarray):
+        """_record_error的数组版本，结果与逐个调用相同（调用方需持有锁）"""
+        n = len(error_signals)
+        if n == 0:
+            return
+        
+        counts = np.arange(self.sample_count + 1, self.sample_count + n + 1)
+        # 从当前累计值开始逐项累加，与逐样本累加的舍入顺序相同
+        cumulative_power = np.cumsum(np.concatenate(([self.total_error_power], error_signals ** 2)))[1:]
+        self.sample_count += n
+        self.total_error_power = cumulative_power[-1].item()
+        
+        # 每10个样本记录一次平均误差功率
+        marks = counts % 10 == 0
+        if not marks.any():
+            return
+        self.error_power_history.extend((cumulative_power[marks] / counts[marks]).tolist())
+        
+        # 噪声抑制效果只取决于最后一次记录
+        if len(self.error_power_history) > 10:
+            initial_power = np.mean(self.error_power_history[:10]).item()
+            current_power = self.error_power_history[-1]
+            if current_power > 0 and initial_power > 0:
+                self.noise_reduction_db = 10.0 * math.log10(initial_power / current_power)
+                self.noise_reduction_db = max(0, self.noise_reduction_db)  # 确保非负
+    
     def batch_filter(self, main_signals: np.ndarray, 
                     reference_signals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
         批处理信号滤波
         
+        整段样本在LMS块内核中逐个迭代，结果与逐个调用filter_sample相同
+        
         参数:
             main_signals (np.ndarray): 主信号数组
             reference_signals (np.ndarray): 参考信号数组
@@ -141,17 +169,28 @@ class LMSFilter:
         返回:
             Tuple[np.ndarray, np.ndarray]: (滤波后信号数组, 噪声估计数组)
         """
+        main_signals = np.ascontiguousarray(main_signals, dtype=np.float64)
+        reference_signals = np.ascontiguousarray(reference_signals, dtype=np.float64)
         if len(main_signals) != len(reference_signals):
             raise ValueError("主信号和参考信号长度必须相等")
         
-        filtered_signals = np.zeros_like(main_signals)
-        noise_estimates = np.zeros_like(main_signals)
+        filtered_signals = np.empty_like(main_signals)
+        noise_estimates = np.empty_like(main_signals)
         
-        for i, (main, ref) in enumerate(zip(main_signals, reference_signals)):
-            filtered_signals[i], noise_estimates[i] = self.filter_sample(main, ref)
+        with self._lock:
+            self._filter_block(main_signals, reference_signals, filtered_signals, noise_estimates)
         
         return filtered_signals, noise_estimates
     
+    def _filter_block(self, main_signals: np.ndarray, reference_signals: np.ndarray,
+                      filtered_signals: np.ndarray, noise_estimates: np.ndarray):
+        """用块内核处理一段样本，结果写入输出数组（调用方需持有锁）"""
+        lms_block(
+            self.weights, self.reference_buffer, main_signals, reference_signals,
+            float(self.step_size), float(self.leakage), filtered_signals, noise_estimates
+        )
+        self._record_errors(filtered_signals)
+    
     def get_filter_response(self) -> np.ndarray:
         """
         获取滤波器频率响应（用于调试和监控）
@@ -225,7 +264,7 @@ class LMSFilter:
             # 如果滤波器不稳定，减小步长
             if not self.is_stable():
                 self.step_size *= 0.8
-                print(f"检测到不稳定，降低步长至: {self.step_size:.4f}")
+                log.info("检测到不稳定，降低步长至: %.4f", self.step_size)
             
             # 如果收敛太慢，适当增加步长
             elif len(self.error_power_history) > 50:
@@ -233,7 +272,7 @@ class LMSFilter:
                                     self.error_power_history[-1]) / self.error_power_history[-50]
                 if recent_improvement < 0.1:  # 改善不足10%
                     self.step_size = min(0.05, self.step_size * 1.1)
-                    print(f"收敛较慢，增加步长至: {self.step_size:.4f}")
+                    log.info("收敛较慢，增加步长至: %.4f", self.step_size)
     
     def __str__(self) -> str:
         """字符串表示"""
@@ -296,6 +335,25 @@ class AdaptiveLMSFilter(LMSFilter):
         
         return filtered_signal, noise_estimate
     
+    def _filter_block(self, main_signals: np.ndarray, reference_signals: np.ndarray,
+                      filtered_signals: np.ndarray, noise_estimates: np.ndarray):
+        """在参数自适应点处分段调用块内核，与逐样本处理保持一致（调用方需持有锁）"""
+        start = 0
+        n = len(main_signals)
+        while start < n:
+            remaining = self.adaptation_interval - (self.sample_count - self.last_adaptation_sample)
+            end = min(n, start + max(1, remaining))
+            super()._filter_block(main_signals[start:end], reference_signals[start:end],
+                                  filtered_signals[start:end], noise_estimates[start:end])
+            
+            self.performance_window.extend(np.abs(filtered_signals[start:end]).tolist())
+            del self.performance_window[:-self.window_size]
+            
+            if (self.sample_count - self.last_adaptation_sample) >= self.adaptation_interval:
+                self.auto_adjust_parameters()
+                self.last_adaptation_sample = self.sample_count
+            start = end
+    
     def get_adaptive_metrics(self) -> dict:
         """
         获取自适应相关的性能指标
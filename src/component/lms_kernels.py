@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LMS滤波计算内核
+单样本的抽头更新、输出计算和权重更新均原地修改数组，不产生临时对象；
+块内核把整段样本的逐样本迭代放在同一个循环中完成，省去每个样本的Python调用开销；
+安装了numba时编译为本地代码，未安装时使用等价的numpy实现
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _lms_step_numpy(weights, buffer, main_signal, reference_signal, step_size, leakage):
+    """
+    执行一次LMS迭代（numpy实现）
+    
+    参数:
+        weights (np.ndarray): 滤波器权重，原地更新
+        buffer (np.ndarray): 参考信号缓存，buffer[0]为最新样本，原地更新
+        main_signal (float): 主信号
+        reference_signal (float): 参考信号
+        step_size (float): 学习率
+        leakage (float): 泄漏因子
+    
+    返回:
+        Tuple[float, float]: (误差信号, 噪声估计)
+    """
+    buffer[1:] = buffer[:-1]
+    buffer[0] = reference_signal
+    
+    noise_estimate = float(np.dot(weights, buffer))
+    error_signal = main_signal - noise_estimate
+    
+    weights *= leakage
+    weights += (step_size * error_signal) * buffer
+    return error_signal, noise_estimate
+
+
+def _lms_block_numpy(weights, buffer, main_signals, reference_signals, step_size, leakage,
+                    errors, estimates):
+    """
+    对一段样本逐个执行LMS迭代（numpy实现）
+    
+    参数:
+        weights, buffer, step_size, leakage: 同lms_step
+        main_signals (np.ndarray): 主信号数组
+        reference_signals (np.ndarray): 参考信号数组
+        errors (np.ndarray): 输出，误差信号（即滤波后信号）
+        estimates (np.ndarray): 输出，噪声估计
+    """
+    for i in range(main_signals.shape[0]):
+        errors[i], estimates[i] = _lms_step_numpy(
+            weights, buffer, main_signals[i], reference_signals[i], step_size, leakage
+        )
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def lms_step(weights, buffer, main_signal, reference_signal, step_size, leakage):
+        """执行一次LMS迭代（numba编译版本，参数与返回值同numpy实现）"""
+        n = buffer.shape[0]
+        for i in range(n - 1, 0, -1):
+            buffer[i] = buffer[i - 1]
+        buffer[0] = reference_signal
+        
+        noise_estimate = 0.0
+        for i in range(n):
+            noise_estimate += weights[i] * buffer[i]
+        error_signal = main_signal - noise_estimate
+        
+        gain = step_size * error_signal
+        for i in range(n):
+            weights[i] = leakage * weights[i] + gain * buffer[i]
+        return error_signal, noise_estimate
+    
+    @njit(cache=True)
+    def lms_block(weights, buffer, main_signals, reference_signals, step_size, leakage,
+                  errors, estimates):
+        """对一段样本逐个执行LMS迭代（numba编译版本，参数同numpy实现）"""
+        n = buffer.shape[0]
+        for k in range(main_signals.shape[0]):
+            for i in range(n - 1, 0, -1):
+                buffer[i] = buffer[i - 1]
+            buffer[0] = reference_signals[k]
+            
+            noise_estimate = 0.0
+            for i in range(n):
+                noise_estimate += weights[i] * buffer[i]
+            error_signal = main_signals[k] - noise_estimate
+            
+            gain = step_size * error_signal
+            for i in range(n):
+                weights[i] = leakage * weights[i] + gain * buffer[i]
+            
+            errors[k] = error_signal
+            estimates[k] = noise_estimate
+else:
+    lms_step = _lms_step_numpy
+    lms_block = _lms_block_numpy
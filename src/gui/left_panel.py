@@ -14,43 +14,66 @@ from PySide6.QtGui import QFont, QIcon
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from instrument.pm100d import PM100D, rm
+from instrument.pm100d import PM100D, VisaPool, rm
+from instrument.usbtmc import list_usbtmc_devices
 from utils.device_cache import DeviceCache
 import pyvisa
 
 
+# 并行探测/连接设备的最大线程数（各设备的VISA往返相互重叠，总耗时约为最慢设备的耗时）
+MAX_PARALLEL_CONNECTS = 8
+
+
 class DeviceSearchThread(QThread):
     """设备搜索线程"""
     devices_found = Signal(list)
     search_finished = Signal()
     
-    def run(self):
-        """搜索可用的PM100D设备"""
+    @staticmethod
+    def _probe(resource):
+        """探测单个资源是否为PM100D，是则返回设备信息，否则返回None"""
+        temp_inst = None
         try:
-            # 获取所有可用的VISA资源
-            resources = rm.list_resources()
-            pm100d_devices = []
+            # 尝试连接并检查是否为PM100D（会话从池中取出，随后连接该设备时可直接复用）
+            temp_inst = VisaPool.acquire(resource)
+            temp_inst.timeout = 1000  # 短超时用于快速检测
+            
+            idn = temp_inst.query("*IDN?").strip()
+            if "PM100D" in idn.upper():
+                VisaPool.release(temp_inst)
+                return {
+                    'resource': resource,
+                    'idn': idn
+                }
             
-            for resource in resources:
+            # 非目标设备不占用池中的会话
+            temp_inst.close()
+            
+        except Exception:
+            # 连接失败或不是目标设备，已打开的会话可能已失效，直接关闭
+            if temp_inst is not None:
                 try:
-                    # 尝试连接并检查是否为PM100D
-                    temp_inst = rm.open_resource(resource)
-                    temp_inst.timeout = 1000  # 短超时用于快速检测
-                    
-                    idn = temp_inst.query("*IDN?").strip()
-                    if "PM100D" in idn.upper():
-                        pm100d_devices.append({
-                            'resource': resource,
-                            'idn': idn
-                        })
-                    
                     temp_inst.close()
-                    
                 except Exception:
-                    # 连接失败或不是目标设备，继续下一个
-                    continue
+                    pass
+        return None
+    
+    def run(self):
+        """搜索可用的PM100D设备（并行探测所有VISA资源）"""
+        try:
+            # 获取所有可用的VISA资源，以及 Linux 内核 usbtmc 驱动的设备文件
+            resources = tuple(rm.list_resources()) + tuple(list_usbtmc_devices())
+            pm100d_devices = []
+            
+            if resources:
+                with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CONNECTS, len(resources))) as executor:
+                    # map 按资源列表顺序返回结果，显示顺序与串行探测一致
+                    for device in executor.map(self._probe, resources):
+                        if device is not None:
+                            pm100d_devices.append(device)
             
             self.devices_found.emit(pm100d_devices)
             
@@ -70,29 +93,49 @@ class QuickConnectThread(QThread):
         self.cached_devices = cached_devices
         self.connected_devices = []
         
+    @staticmethod
+    def _connect(resource):
+        """连接单个缓存设备（在线程池中执行）"""
+        print(f"尝试连接缓存设备: {resource}")
+        
+        # 创建PM100D实例
+        pm100d = PM100D(resource)
+        
+        # 验证设备响应，失败时关闭实例后再抛出，避免会话泄漏
+        try:
+            pm100d.write("*IDN?", q=True)
+        except Exception:
+            try:
+                pm100d.close()
+            except Exception:
+                pass
+            raise
+        return pm100d
+        
     def run(self):
-        """尝试快速连接缓存的设备"""
+        """并行连接缓存的设备，每个设备连接完成即报告结果"""
         print(f"开始快速连接 {len(self.cached_devices)} 个缓存设备")
         
-        for device_info in self.cached_devices:
-            resource = device_info['resource']
-            try:
-                print(f"尝试连接缓存设备: {resource}")
-                
-                # 创建PM100D实例
-                pm100d = PM100D(resource)
-                
-                # 验证设备响应
-                idn_response = pm100d.write("*IDN?", q=True).strip()
-                
-                self.connection_result.emit(resource, True, pm100d, "")
-                self.connected_devices.append((resource, pm100d))
-                print(f"成功连接到缓存设备: {resource}")
-                
-            except Exception as e:
-                error_msg = str(e)
-                print(f"连接缓存设备失败 {resource}: {error_msg}")
-                self.connection_result.emit(resource, False, None, error_msg)
+        if self.cached_devices:
+            workers = min(MAX_PARALLEL_CONNECTS, len(self.cached_devices))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._connect, device_info['resource']): device_info['resource']
+                    for device_info in self.cached_devices
+                }
+                for future in as_completed(futures):
+                    resource = futures[future]
+                    try:
+                        pm100d = future.result()
+                    except Exception as e:
+                        error_msg = str(e)
+                        print(f"连接缓存设备失败 {resource}: {error_msg}")
+                        self.connection_result.emit(resource, False, None, error_msg)
+                        continue
+                    
+                    self.connection_result.emit(resource, True, pm100d, "")
+                    self.connected_devices.append((resource, pm100d))
+                    print(f"成功连接到缓存设备: {resource}")
         
         self.connection_finished.emit()
 
@@ -751,7 +794,6 @@ class LeftPanel(QWidget):
                 print(f"设备 {device_id} 连接测试失败: {e}")
         
         # 显示测试结果
-        from PySide6.QtWidgets import QMessageBox
         if failed_devices:
             msg = f"连接测试完成！\n\n正常: {len(healthy_devices)} 个设备\n异常: {len(failed_devices)} 个设备\n\n异常设备: {', '.join(failed_devices)}"
             QMessageBox.warning(self, "连接测试", msg)
@@ -769,7 +811,6 @@ class LeftPanel(QWidget):
         # 更新状态概览
         self.update_device_overview()
         
-        from PySide6.QtWidgets import QMessageBox
         QMessageBox.information(self, "状态刷新", f"已刷新所有 {len(self.connected_devices)} 个设备的状态信息")
         
     def closeEvent(self, event):
@@ -785,5 +826,8 @@ class LeftPanel(QWidget):
         if self.search_thread and self.search_thread.isRunning():
             self.search_thread.quit()
             self.search_thread.wait()
+        
+        # 写入尚未保存的设备缓存修改
+        self.device_cache.flush()
             
         event.accept()
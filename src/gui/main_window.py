@@ -4,13 +4,16 @@ from PySide6.QtWidgets import (
     QFileDialog, QProgressBar, QLabel
 )
 from PySide6.QtGui import QAction, QIcon, QDragEnterEvent, QDropEvent, QCloseEvent
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QEvent
 
+import csv
+import logging
 import sys
 import os
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from instrument.pm100d import PM100D
+from instrument.pm100d import PM100D, VisaPool
 from .left_panel import LeftPanel
 from .plot_widget import PlotWidget
 from .right_panel import RightPanel
@@ -66,9 +69,8 @@ class MainWindow(QMainWindow):
         self.right_panel.setMinimumWidth(300)
         self.right_panel.setMaximumWidth(400)
         
-        # 将绘图组件引用和主窗口引用传递给右侧面板
+        # 将绘图组件引用传递给右侧面板
         self.right_panel.set_plot_widget(self.plot_widget)
-        self.right_panel.set_main_window(self)
         
         splitter.addWidget(self.right_panel)
         
@@ -81,6 +83,9 @@ class MainWindow(QMainWindow):
         # 创建状态栏
         self.create_status_bar()
         
+        # 状态栏创建后再传递主窗口引用，右侧面板会直接绑定状态栏控件
+        self.right_panel.set_main_window(self)
+        
     def create_menu_bar(self):
         """创建菜单栏"""
         menubar = self.menuBar()
@@ -119,6 +124,14 @@ class MainWindow(QMainWindow):
         # 帮助菜单
         help_menu = menubar.addMenu('帮助')
         
+        # 调试日志开关
+        debug_log_action = QAction('输出调试日志', self)
+        debug_log_action.setCheckable(True)
+        debug_log_action.toggled.connect(self.set_debug_logging)
+        help_menu.addAction(debug_log_action)
+        
+        help_menu.addSeparator()
+        
         # 关于动作
         about_action = QAction('关于', self)
         about_action.triggered.connect(self.show_about)
@@ -245,9 +258,6 @@ class MainWindow(QMainWindow):
         
         if file_path:
             try:
-                import csv
-                import time
-                
                 # 从plot_widget获取所有数据
                 time_data = self.plot_widget.time_data
                 power_data = self.plot_widget.power_data
@@ -357,10 +367,6 @@ class MainWindow(QMainWindow):
         print(f"时间数据点数: {len(self.plot_widget.time_data)}")
         
         try:
-            import csv
-            import time
-            import os
-            
             # 生成自动保存文件名（带时间戳）
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             filename = f"PM100D_数据_{timestamp}.csv"
@@ -427,6 +433,13 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "自动保存失败", error_msg)
             print(f"自动保存失败: {e}")
                 
+    def set_debug_logging(self, enabled):
+        """切换界面、滤波、仪器和工具模块的调试日志输出（默认只输出警告和错误）"""
+        level = logging.DEBUG if enabled else logging.NOTSET
+        for name in ('gui', 'component', 'instrument', 'utils'):
+            logging.getLogger(name).setLevel(level)
+        self.status_bar.showMessage(f"调试日志已{'开启' if enabled else '关闭'}", 2000)
+        
     def show_about(self):
         """显示关于对话框"""
         QMessageBox.about(
@@ -438,6 +451,12 @@ class MainWindow(QMainWindow):
             "支持多设备连接、实时数据显示和数据可视化功能。"
         )
         
+    def changeEvent(self, event):
+        """窗口状态变化事件：通知绘图组件最小化状态，恢复时补绘图形"""
+        if event.type() == QEvent.WindowStateChange:
+            self.plot_widget.set_window_minimized(self.isMinimized())
+        super().changeEvent(event)
+        
     def closeEvent(self, event):
         """窗口关闭事件"""
         # 确认是否退出
@@ -450,8 +469,7 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.Yes:
             # 停止数据采集
-            if hasattr(self.right_panel, 'data_timer'):
-                self.right_panel.data_timer.stop()
+            self.right_panel.shutdown_acquisition()
             
             # 断开所有设备
             for device_id, device in self.pm100ds.items():
@@ -464,6 +482,9 @@ class MainWindow(QMainWindow):
             # 清理左侧面板资源
             self.left_panel.closeEvent(event)
             
+            # 关闭会话池中缓存的VISA会话
+            VisaPool.close_all()
+            
             event.accept()
         else:
             event.ignore()
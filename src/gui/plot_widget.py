@@ -2,17 +2,26 @@
 # -*- coding: utf-8 -*-
 """
 数据可视化组件 - 支持噪声滤波对比显示
+
+实时绘图使用pyqtgraph（直接基于QPainter/OpenGL），
+matplotlib仅用于导出高分辨率静态图片。
 """
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QComboBox
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QComboBox, QFileDialog
+)
+from PySide6.QtCore import Qt, Signal, QTimer
+import pyqtgraph as pg
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.font_manager as fm
-import matplotlib.patches as patches
 import platform
+import logging
+import math
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+log = logging.getLogger(__name__)
 
 # 配置matplotlib中文字体
 def setup_chinese_font():
@@ -42,9 +51,66 @@ def setup_chinese_font():
     import warnings
     warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib.font_manager')
 
-# 初始化字体设置
+# 初始化字体设置（导出图片时使用）
 setup_chinese_font()
 
+# pyqtgraph全局配置：OpenGL视口 + 关闭抗锯齿以获得最大吞吐
+pg.setConfigOptions(useOpenGL=True, antialias=False, background='w', foreground='k')
+
+# 安装了numba时启用pyqtgraph的numba加速（数据缩放/降采样），未安装时保持默认实现
+try:
+    import numba  # noqa: F401
+    pg.setConfigOptions(useNumba=True)
+    log.info("已启用pyqtgraph numba加速")
+except ImportError:
+    pass
+except KeyError:
+    # 旧版pyqtgraph不支持useNumba选项
+    pass
+
+
+# 没有滤波处理信息的采样共用同一个空字典（只读），避免每个采样新建对象
+_NO_PROCESSING_INFO = {}
+
+
+class SeriesBuffer:
+    """
+    按需扩容的float64数据序列
+    
+    提供与list相近的append/len/索引接口，同时可通过view()
+    以零拷贝方式将数据交给pyqtgraph绘制
+    """
+    
+    def __init__(self, capacity=1024):
+        self._data = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+    
+    def append(self, value):
+        """追加一个数据点（容量不足时倍增扩容）"""
+        if self._size == self._data.shape[0]:
+            grown = np.empty(self._data.shape[0] * 2, dtype=np.float64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+    
+    def view(self):
+        """返回有效数据的视图（不复制）"""
+        return self._data[:self._size]
+    
+    def clear(self):
+        """清空数据（保留已分配的内存）"""
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def __getitem__(self, index):
+        return self.view()[index]
+    
+    def __iter__(self):
+        return iter(self.view())
+
 
 class PlotWidget(QWidget):
     """数据绘图组件 - 支持噪声滤波对比显示"""
@@ -52,6 +118,24 @@ class PlotWidget(QWidget):
     # 信号定义
     view_mode_changed = Signal(str)  # 视图模式改变信号
     
+    # 各显示模式的子图布局: (子图键, 标题, x轴标签, y轴标签)
+    SUBPLOT_LAYOUTS = {
+        "raw": [("main", "PM100D 原始功率监测", "时间 (s)", "功率 (W)")],
+        "filtered": [("main", "PM100D 滤波后功率监测", "时间 (s)", "功率 (W)")],
+        "comparison": [
+            ("main", "原始信号", "", "功率 (W)"),
+            ("filtered", "滤波后信号", "时间 (s)", "功率 (W)")
+        ],
+        "snr": [
+            ("main", "原始信号", "", "功率 (W)"),
+            ("filtered", "滤波信号", "", "功率 (W)"),
+            ("snr", "SNR改善", "时间 (s)", "dB")
+        ]
+    }
+    
+    # 实时数据最短重绘间隔（毫秒）
+    REFRESH_INTERVAL_MS = 50
+    
     def __init__(self):
         super().__init__()
         
@@ -61,7 +145,7 @@ class PlotWidget(QWidget):
         self.show_statistics = True
         
         # 数据存储扩展
-        self.time_data = []
+        self.time_data = SeriesBuffer()
         self.power_data = {}          # 原始功率数据
         self.filtered_data = {}       # 滤波后数据
         self.noise_data = {}          # 噪声估计数据
@@ -71,8 +155,25 @@ class PlotWidget(QWidget):
         # 统计信息
         self.statistics = {}
         
-        self.init_ui()
+        # SNR延迟计算：设备ID -> 第一个未计算SNR的样本索引
+        self._snr_stale_from = {}
+        
+        # 绘图对象
+        self._plots = {}              # 子图键 -> pg.PlotWidget
+        self._lines = {}              # (子图键, 设备ID, 数据类型) -> pg.PlotDataItem
+        self._device_colors = {}      # 设备ID -> 颜色
+        self._stats_item = None       # 统计信息文本
         
+        # 节流刷新：新数据只标记待刷新，最多每 REFRESH_INTERVAL_MS 重绘一次
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self.update_plot)
+        self._redraw_pending = False  # 窗口最小化期间是否有未绘制的数据
+        self._window_minimized = False  # 主窗口是否最小化（由主窗口状态变化事件更新）
+        
+        self.init_ui()
+    
     def init_ui(self):
         """初始化用户界面"""
         main_layout = QVBoxLayout(self)
@@ -81,15 +182,13 @@ class PlotWidget(QWidget):
         control_panel = self.create_control_panel()
         main_layout.addWidget(control_panel)
         
-        # 创建matplotlib图形
-        self.figure = Figure(figsize=(12, 8), dpi=100)
-        self.canvas = FigureCanvas(self.figure)
+        # 子图容器
+        self.plot_layout = QVBoxLayout()
+        main_layout.addLayout(self.plot_layout)
         
         # 根据显示模式创建子图
         self.create_subplots()
-        
-        main_layout.addWidget(self.canvas)
-        
+    
     def create_control_panel(self):
         """创建控制面板"""
         panel = QWidget()
@@ -128,74 +227,74 @@ class PlotWidget(QWidget):
         layout.addStretch()  # 添加弹性空间
         
         return panel
-        
+    
     def create_subplots(self):
         """根据显示模式创建子图"""
-        self.figure.clear()
-        
-        if self.view_mode == "raw":
-            # 单子图显示原始数据
-            self.ax_main = self.figure.add_subplot(111)
-            self.setup_axis(self.ax_main, "PM100D 原始功率监测", "时间 (s)", "功率 (W)")
-            
-        elif self.view_mode == "filtered":
-            # 单子图显示滤波数据
-            self.ax_main = self.figure.add_subplot(111)
-            self.setup_axis(self.ax_main, "PM100D 滤波后功率监测", "时间 (s)", "功率 (W)")
+        # 移除旧的子图
+        for plot in self._plots.values():
+            self.plot_layout.removeWidget(plot)
+            plot.deleteLater()
+        self._plots.clear()
+        self._lines.clear()
+        self._stats_item = None
+        
+        first_plot = None
+        for key, title, xlabel, ylabel in self.SUBPLOT_LAYOUTS[self.view_mode]:
+            plot = pg.PlotWidget()
+            self.setup_axis(plot, title, xlabel, ylabel)
+            plot.addLegend(offset=(-10, 10))
             
-        elif self.view_mode == "comparison":
-            # 双子图对比显示
-            self.ax_main = self.figure.add_subplot(211)
-            self.ax_filtered = self.figure.add_subplot(212, sharex=self.ax_main)
+            # 只绘制可见区域并自动降采样
+            plot.setClipToView(True)
+            plot.setDownsampling(auto=True, mode='peak')
             
-            self.setup_axis(self.ax_main, "原始信号", "时间 (s)", "功率 (W)")
-            self.setup_axis(self.ax_filtered, "滤波后信号", "时间 (s)", "功率 (W)")
-            
-        elif self.view_mode == "snr":
-            # 三子图：原始、滤波、SNR
-            self.ax_main = self.figure.add_subplot(311)
-            self.ax_filtered = self.figure.add_subplot(312, sharex=self.ax_main)
-            self.ax_snr = self.figure.add_subplot(313, sharex=self.ax_main)
+            # 多子图共享x轴
+            if first_plot is None:
+                first_plot = plot
+            else:
+                plot.setXLink(first_plot)
             
-            self.setup_axis(self.ax_main, "原始信号", "", "功率 (W)")
-            self.setup_axis(self.ax_filtered, "滤波信号", "", "功率 (W)")
-            self.setup_axis(self.ax_snr, "SNR改善", "时间 (s)", "dB")
-        
-        self.figure.tight_layout()
+            self._plots[key] = plot
+            self.plot_layout.addWidget(plot)
     
-    def setup_axis(self, ax, title, xlabel, ylabel):
+    def setup_axis(self, plot, title, xlabel, ylabel):
         """设置坐标轴"""
-        ax.set_title(title, fontsize=12, fontweight='bold')
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        ax.grid(True, alpha=0.3)
-        
+        plot.setTitle(title, bold=True)
+        plot.setLabel('bottom', xlabel)
+        plot.setLabel('left', ylabel)
+        plot.showGrid(x=True, y=True, alpha=0.3)
+    
     def on_view_mode_changed(self, mode_text):
         """视图模式改变处理"""
         mode_map = {
             "原始数据": "raw",
-            "滤波数据": "filtered", 
+            "滤波数据": "filtered",
             "对比显示": "comparison",
             "SNR分析": "snr"
         }
         
         self.view_mode = mode_map.get(mode_text, "raw")
+        if self.view_mode == "snr":
+            self.backfill_snr()
         self.create_subplots()
         self.update_plot()
         
         self.view_mode_changed.emit(self.view_mode)
-        
+    
     def on_noise_display_toggled(self, checked):
         """噪声显示切换"""
         self.show_noise_estimate = checked
+        self.create_subplots()
         self.update_plot()
-        
+    
     def on_stats_display_toggled(self, checked):
         """统计信息显示切换"""
         self.show_statistics = checked
+        if checked:
+            self.backfill_snr()
         self.update_plot()
-        
-    def add_device_data(self, device_id, time_point, power_value, filtered_value=None, 
+    
+    def add_device_data(self, device_id, time_point, power_value, filtered_value=None,
                        noise_estimate=None, processing_info=None):
         """
         添加设备数据点（扩展支持滤波数据）
@@ -208,16 +307,62 @@ class PlotWidget(QWidget):
             noise_estimate (float, optional): 噪声估计值
             processing_info (dict, optional): 处理信息
         """
-        print(f"PlotWidget: 接收数据 - 设备={device_id}, 时间={time_point}, 原始={power_value:.6e}")
+        self._append_device_sample(device_id, time_point, power_value, filtered_value,
+                                   noise_estimate, processing_info)
+        
+        # 更新图形（节流）
+        self.schedule_plot_update()
+    
+    def add_device_batch(self, time_point, samples):
+        """
+        批量添加同一时刻多个设备的数据点，整批只重绘一次
+        
+        参数:
+            time_point (float): 本批数据共用的时间点
+            samples (list): (设备ID, 原始功率, 滤波后功率, 噪声估计, 处理信息) 元组列表
+        """
+        if not samples:
+            return
+        
+        append = self._append_device_sample
+        for device_id, power_value, filtered_value, noise_estimate, processing_info in samples:
+            append(device_id, time_point, power_value, filtered_value, noise_estimate, processing_info)
+        
+        self.schedule_plot_update()
+    
+    def schedule_plot_update(self):
+        """请求重绘；刷新间隔内的多次请求合并为一次update_plot，窗口最小化时推迟到恢复后"""
+        if self._window_minimized:
+            self._redraw_pending = True
+            return
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+    
+    def set_window_minimized(self, minimized):
+        """主窗口最小化状态变化时调用，恢复显示时补绘推迟的数据"""
+        self._window_minimized = minimized
+        if not minimized:
+            self.flush_pending_redraw()
+    
+    def flush_pending_redraw(self):
+        """窗口恢复显示后补绘最小化期间推迟的数据"""
+        if self._redraw_pending:
+            self._redraw_pending = False
+            self.update_plot()
+    
+    def _append_device_sample(self, device_id, time_point, power_value, filtered_value=None,
+                              noise_estimate=None, processing_info=None):
+        """追加单个数据点到缓冲区并更新统计（不重绘）"""
+        log.debug("PlotWidget: 接收数据 - 设备=%s, 时间=%s, 原始=%.6e", device_id, time_point, power_value)
         
         # 初始化设备数据存储
         if device_id not in self.power_data:
-            self.power_data[device_id] = []
-            self.filtered_data[device_id] = []
-            self.noise_data[device_id] = []
-            self.snr_data[device_id] = []
+            self.power_data[device_id] = SeriesBuffer()
+            self.filtered_data[device_id] = SeriesBuffer()
+            self.noise_data[device_id] = SeriesBuffer()
+            self.snr_data[device_id] = SeriesBuffer()
             self.processing_info[device_id] = []
-            print(f"PlotWidget: 为设备 {device_id} 创建新的数据存储")
+            log.debug("PlotWidget: 为设备 %s 创建新的数据存储", device_id)
         
         # 确保时间数据同步
         if len(self.time_data) <= len(self.power_data[device_id]):
@@ -229,7 +374,7 @@ class PlotWidget(QWidget):
         # 添加滤波数据
         if filtered_value is not None:
             self.filtered_data[device_id].append(filtered_value)
-            print(f"PlotWidget: 滤波值={filtered_value:.6e}")
+            log.debug("PlotWidget: 滤波值=%.6e", filtered_value)
         else:
             self.filtered_data[device_id].append(power_value)  # 无滤波时使用原始值
         
@@ -239,22 +384,22 @@ class PlotWidget(QWidget):
         else:
             self.noise_data[device_id].append(0.0)
         
-        # 计算并添加SNR数据
-        snr_value = self.calculate_snr_improvement(device_id)
+        # 计算并添加SNR数据（仅在SNR视图或统计信息可见时计算）
+        if self.view_mode == "snr" or self.show_statistics:
+            snr_value = self.calculate_snr_improvement(device_id)
+        else:
+            snr_value = 0.0
+            self._snr_stale_from.setdefault(device_id, len(self.snr_data[device_id]))
         self.snr_data[device_id].append(snr_value)
         
         # 保存处理信息
-        if processing_info is not None:
-            self.processing_info[device_id].append(processing_info)
-        else:
-            self.processing_info[device_id].append({})
+        self.processing_info[device_id].append(
+            processing_info if processing_info is not None else _NO_PROCESSING_INFO
+        )
         
         # 更新统计信息
         self.update_device_statistics(device_id)
-        
-        # 更新图形
-        self.update_plot()
-        
+    
     def calculate_snr_improvement(self, device_id, window_size=20):
         """
         计算SNR改善
@@ -266,28 +411,58 @@ class PlotWidget(QWidget):
         返回:
             float: SNR改善值 (dB)
         """
-        if (len(self.power_data[device_id]) < window_size or 
+        if (len(self.power_data[device_id]) < window_size or
             len(self.filtered_data[device_id]) < window_size):
             return 0.0
         
         try:
             # 计算最近窗口的标准差
-            raw_recent = np.array(self.power_data[device_id][-window_size:])
-            filtered_recent = np.array(self.filtered_data[device_id][-window_size:])
+            raw_recent = self.power_data[device_id][-window_size:]
+            filtered_recent = self.filtered_data[device_id][-window_size:]
             
-            raw_std = np.std(raw_recent)
-            filtered_std = np.std(filtered_recent)
+            raw_std = np.std(raw_recent).item()
+            filtered_std = np.std(filtered_recent).item()
             
             if raw_std > 0 and filtered_std > 0:
-                snr_improvement = 20 * np.log10(raw_std / filtered_std)
-                return max(0, snr_improvement)  # 确保非负
+                # 标量运算使用math，避免numpy ufunc分派开销
+                return max(0.0, 20.0 * math.log10(raw_std / filtered_std))  # 确保非负
             else:
                 return 0.0
-                
+        
         except Exception as e:
-            print(f"计算SNR改善失败: {e}")
+            log.warning("计算SNR改善失败: %s", e)
             return 0.0
     
+    def backfill_snr(self, window_size=20):
+        """
+        一次性批量补算之前跳过的SNR数据
+        
+        参数:
+            window_size (int): 计算窗口大小（与calculate_snr_improvement一致）
+        """
+        for device_id, start in self._snr_stale_from.items():
+            if device_id not in self.snr_data:
+                continue
+            
+            snr_values = self.snr_data[device_id].view()
+            count = len(snr_values)
+            first = max(start, window_size - 1)
+            if first >= count:
+                continue
+            
+            # 滑动窗口批量计算标准差
+            raw = self.power_data[device_id].view()[first - window_size + 1:count]
+            filtered = self.filtered_data[device_id].view()[first - window_size + 1:count]
+            raw_std = sliding_window_view(raw, window_size).std(axis=1)
+            filtered_std = sliding_window_view(filtered, window_size).std(axis=1)
+            
+            valid = (raw_std > 0) & (filtered_std > 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                snr = 20.0 * np.log10(raw_std / filtered_std)
+            snr_values[first:count] = np.where(valid, np.maximum(snr, 0.0), 0.0)
+        
+        self._snr_stale_from.clear()
+    
     def update_device_statistics(self, device_id):
         """
         更新设备统计信息
@@ -303,8 +478,8 @@ class PlotWidget(QWidget):
         
         try:
             # 计算基本统计
-            raw_data = np.array(self.power_data[device_id][-50:])  # 最近50个点
-            filtered_data = np.array(self.filtered_data[device_id][-50:])
+            raw_data = self.power_data[device_id][-50:]  # 最近50个点
+            filtered_data = self.filtered_data[device_id][-50:]
             
             self.statistics[device_id] = {
                 'raw_mean': np.mean(raw_data),
@@ -315,144 +490,80 @@ class PlotWidget(QWidget):
                 'snr_improvement': self.snr_data[device_id][-1] if self.snr_data[device_id] else 0,
                 'sample_count': len(self.power_data[device_id])
             }
-            
-        except Exception as e:
-            print(f"更新统计信息失败: {e}")
-        
-    def update_plot(self):
-        """更新图形显示（根据显示模式）"""
-        if not hasattr(self, 'ax_main'):
-            return
         
-        # 清除所有子图
-        if hasattr(self, 'ax_main'):
-            self.ax_main.clear()
-        if hasattr(self, 'ax_filtered'):
-            self.ax_filtered.clear()
-        if hasattr(self, 'ax_snr'):
-            self.ax_snr.clear()
+        except Exception as e:
+            log.warning("更新统计信息失败: %s", e)
+    
+    def iter_series(self):
+        """
+        按当前显示模式生成需要绘制的曲线
         
-        # 根据视图模式绘制
+        生成:
+            tuple: (子图键, 设备ID, 数据类型, 图例名称, 数据序列)
+        """
         if self.view_mode == "raw":
-            self.plot_raw_data()
-        elif self.view_mode == "filtered":
-            self.plot_filtered_data()
-        elif self.view_mode == "comparison":
-            self.plot_comparison_data()
-        elif self.view_mode == "snr":
-            self.plot_snr_analysis()
-        
-        # 添加统计信息文本
-        if self.show_statistics:
-            self.add_statistics_text()
-        
-        # 刷新画布
-        self.canvas.draw()
-    
-    def plot_raw_data(self):
-        """绘制原始数据"""
-        self.setup_axis(self.ax_main, "PM100D 原始功率监测", "时间 (s)", "功率 (W)")
-        
-        for device_id, power_values in self.power_data.items():
-            if power_values and len(power_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(power_values)]
-                self.ax_main.plot(time_subset, power_values, 
-                                marker='o', markersize=2, alpha=0.7,
-                                label=f"{device_id} (原始)", linewidth=1.5)
+            for device_id, power_values in self.power_data.items():
+                yield "main", device_id, "raw", f"{device_id} (原始)", power_values
                 
                 # 可选显示噪声估计
                 if self.show_noise_estimate and device_id in self.noise_data:
-                    noise_values = self.noise_data[device_id][:len(time_subset)]
-                    self.ax_main.plot(time_subset, noise_values,
-                                    '--', alpha=0.5, linewidth=1,
-                                    label=f"{device_id} (噪声估计)")
-        
-        if self.power_data:
-            self.ax_main.legend()
-    
-    def plot_filtered_data(self):
-        """绘制滤波数据"""
-        self.setup_axis(self.ax_main, "PM100D 滤波后功率监测", "时间 (s)", "功率 (W)")
-        
-        for device_id, filtered_values in self.filtered_data.items():
-            if filtered_values and len(filtered_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(filtered_values)]
-                self.ax_main.plot(time_subset, filtered_values,
-                                marker='s', markersize=2, alpha=0.8,
-                                label=f"{device_id} (滤波)", linewidth=1.5)
-        
-        if self.filtered_data:
-            self.ax_main.legend()
-    
-    def plot_comparison_data(self):
-        """绘制对比数据"""
-        # 原始信号子图
-        self.setup_axis(self.ax_main, "原始信号", "", "功率 (W)")
-        for device_id, power_values in self.power_data.items():
-            if power_values and len(power_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(power_values)]
-                self.ax_main.plot(time_subset, power_values,
-                                marker='o', markersize=1.5, alpha=0.7,
-                                label=f"{device_id}", linewidth=1)
-        
-        if self.power_data:
-            self.ax_main.legend(loc='upper right', fontsize=9)
-        
-        # 滤波信号子图
-        self.setup_axis(self.ax_filtered, "滤波后信号", "时间 (s)", "功率 (W)")
-        for device_id, filtered_values in self.filtered_data.items():
-            if filtered_values and len(filtered_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(filtered_values)]
-                self.ax_filtered.plot(time_subset, filtered_values,
-                                    marker='s', markersize=1.5, alpha=0.8,
-                                    label=f"{device_id}", linewidth=1)
-        
-        if self.filtered_data:
-            self.ax_filtered.legend(loc='upper right', fontsize=9)
-    
-    def plot_snr_analysis(self):
-        """绘制SNR分析"""
-        # 原始信号
-        self.setup_axis(self.ax_main, "原始信号", "", "功率 (W)")
-        for device_id, power_values in self.power_data.items():
-            if power_values and len(power_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(power_values)]
-                self.ax_main.plot(time_subset, power_values,
-                                alpha=0.6, linewidth=1, label=f"{device_id}")
-        
-        # 滤波信号
-        self.setup_axis(self.ax_filtered, "滤波信号", "", "功率 (W)")
-        for device_id, filtered_values in self.filtered_data.items():
-            if filtered_values and len(filtered_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(filtered_values)]
-                self.ax_filtered.plot(time_subset, filtered_values,
-                                    alpha=0.8, linewidth=1, label=f"{device_id}")
-        
-        # SNR改善
-        self.setup_axis(self.ax_snr, "SNR改善", "时间 (s)", "dB")
-        for device_id, snr_values in self.snr_data.items():
-            if snr_values and len(snr_values) <= len(self.time_data):
-                time_subset = self.time_data[:len(snr_values)]
-                self.ax_snr.plot(time_subset, snr_values,
-                               linewidth=2, label=f"{device_id}")
-        
-        # 添加图例
-        if self.power_data:
-            self.ax_main.legend(loc='upper right', fontsize=8)
-            self.ax_filtered.legend(loc='upper right', fontsize=8)
-            self.ax_snr.legend(loc='upper right', fontsize=8)
+                    yield "main", device_id, "noise", f"{device_id} (噪声估计)", self.noise_data[device_id]
+        
+        elif self.view_mode == "filtered":
+            for device_id, filtered_values in self.filtered_data.items():
+                yield "main", device_id, "filtered", f"{device_id} (滤波)", filtered_values
+        
+        else:
+            # 对比显示与SNR分析：原始信号 + 滤波信号（+ SNR改善）
+            for device_id, power_values in self.power_data.items():
+                yield "main", device_id, "raw", device_id, power_values
+            for device_id, filtered_values in self.filtered_data.items():
+                yield "filtered", device_id, "filtered", device_id, filtered_values
+            if self.view_mode == "snr":
+                for device_id, snr_values in self.snr_data.items():
+                    yield "snr", device_id, "snr", device_id, snr_values
     
-    def add_statistics_text(self):
-        """添加统计信息文本"""
-        if not self.statistics:
+    def get_device_color(self, device_id):
+        """获取设备曲线颜色（按设备出现顺序分配）"""
+        if device_id not in self._device_colors:
+            self._device_colors[device_id] = pg.intColor(len(self._device_colors), hues=9)
+        return self._device_colors[device_id]
+    
+    def make_pen(self, device_id, kind):
+        """根据数据类型生成画笔"""
+        color = self.get_device_color(device_id)
+        if kind == "noise":
+            return pg.mkPen(color, width=1, style=Qt.DashLine)
+        if kind == "snr":
+            return pg.mkPen(color, width=2)
+        return pg.mkPen(color, width=1.5)
+    
+    def update_plot(self):
+        """更新图形显示（根据显示模式）"""
+        if not self._plots:
             return
         
-        # 选择合适的子图添加文本
-        target_ax = self.ax_main if hasattr(self, 'ax_main') else None
-        if target_ax is None:
-            return
+        time_values = self.time_data.view()
+        
+        for plot_key, device_id, kind, name, values in self.iter_series():
+            count = len(values)
+            if not count or count > len(time_values):
+                continue
+            
+            key = (plot_key, device_id, kind)
+            item = self._lines.get(key)
+            if item is None:
+                item = self._plots[plot_key].plot(pen=self.make_pen(device_id, kind), name=name)
+                self._lines[key] = item
+            
+            # 直接传递numpy视图，无需复制
+            item.setData(time_values[:count], values.view())
         
-        # 构建统计文本
+        # 添加统计信息文本
+        self.add_statistics_text()
+    
+    def format_statistics_text(self):
+        """构建统计信息文本"""
         stats_lines = []
         for device_id, stats in self.statistics.items():
             if stats:
@@ -460,30 +571,87 @@ class PlotWidget(QWidget):
                        f"噪声抑制{stats.get('noise_reduction_ratio', 0)*100:.1f}% "
                        f"样本{stats.get('sample_count', 0)}")
                 stats_lines.append(line)
+        return "\n".join(stats_lines)
+    
+    def add_statistics_text(self):
+        """添加统计信息文本"""
+        stats_text = self.format_statistics_text() if self.show_statistics else ""
+        
+        if not stats_text:
+            if self._stats_item is not None:
+                self._stats_item.setVisible(False)
+            return
+        
+        if self._stats_item is None:
+            # 文本挂在ViewBox上，位置固定在左上角（像素坐标）
+            view_box = self._plots["main"].getViewBox()
+            self._stats_item = pg.TextItem(color='k', fill=pg.mkBrush(245, 222, 179, 204), anchor=(0, 0))
+            self._stats_item.setParentItem(view_box)
+            self._stats_item.setPos(8, 8)
         
-        if stats_lines:
-            stats_text = "\n".join(stats_lines)
-            # 在图的右上角添加文本框
-            target_ax.text(0.02, 0.98, stats_text, transform=target_ax.transAxes,
-                          fontsize=8, verticalalignment='top',
-                          bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+        self._stats_item.setText(stats_text)
+        self._stats_item.setVisible(True)
+    
+    def render_static_figure(self):
+        """
+        使用matplotlib离屏渲染当前视图（用于导出高分辨率图片）
+        
+        返回:
+            Figure: matplotlib图形对象
+        """
+        layout = self.SUBPLOT_LAYOUTS[self.view_mode]
+        figure = Figure(figsize=(12, 8), dpi=100)
+        
+        axes = {}
+        for index, (key, title, xlabel, ylabel) in enumerate(layout):
+            sharex = axes.get("main")
+            ax = figure.add_subplot(len(layout), 1, index + 1, sharex=sharex)
+            ax.set_title(title, fontsize=12, fontweight='bold')
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            ax.grid(True, alpha=0.3)
+            axes[key] = ax
+        
+        time_values = self.time_data.view()
+        for plot_key, device_id, kind, name, values in self.iter_series():
+            count = len(values)
+            if not count or count > len(time_values):
+                continue
+            linestyle = '--' if kind == "noise" else '-'
+            linewidth = 2 if kind == "snr" else 1.5
+            axes[plot_key].plot(time_values[:count], values.view(), linestyle,
+                                linewidth=linewidth, alpha=0.8, label=name)
+        
+        for ax in axes.values():
+            if ax.lines:
+                ax.legend(loc='upper right', fontsize=8)
+        
+        # 添加统计信息文本
+        stats_text = self.format_statistics_text() if self.show_statistics else ""
+        if stats_text:
+            ax_main = axes["main"]
+            ax_main.text(0.02, 0.98, stats_text, transform=ax_main.transAxes,
+                         fontsize=8, verticalalignment='top',
+                         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+        
+        figure.tight_layout()
+        return figure
     
     def export_plot(self):
         """导出当前图片"""
-        from PySide6.QtWidgets import QFileDialog
-        
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "导出图片", f"PM100D_plot_{self.view_mode}.png", 
+            self, "导出图片", f"PM100D_plot_{self.view_mode}.png",
             "PNG files (*.png);;PDF files (*.pdf);;All files (*.*)"
         )
         
         if file_path:
             try:
-                self.figure.savefig(file_path, dpi=300, bbox_inches='tight')
+                figure = self.render_static_figure()
+                figure.savefig(file_path, dpi=300, bbox_inches='tight')
                 print(f"图片已导出: {file_path}")
             except Exception as e:
                 print(f"导出失败: {e}")
-        
+    
     def clear_device_data(self, device_id):
         """清除指定设备的数据（扩展支持所有数据类型）"""
         data_cleared = {}
@@ -511,10 +679,14 @@ class PlotWidget(QWidget):
         if device_id in self.statistics:
             del self.statistics[device_id]
         
+        self._snr_stale_from.pop(device_id, None)
+        
         total_cleared = sum(data_cleared.values())
         print(f"PlotWidget: 清除设备 {device_id} 的数据，共删除 {total_cleared} 个数据点")
         print(f"数据类型分布: {data_cleared}")
         
+        # 重建子图以移除该设备的曲线和图例
+        self.create_subplots()
         self.update_plot()
     
     def clear_all_data(self):
@@ -538,6 +710,7 @@ class PlotWidget(QWidget):
         self.snr_data.clear()
         self.processing_info.clear()
         self.statistics.clear()
+        self._snr_stale_from.clear()
         
         total_cleared = sum(data_summary.values())
         print(f"PlotWidget: 清除所有数据")
@@ -545,6 +718,8 @@ class PlotWidget(QWidget):
         print(f"  总数据点数: {total_cleared}")
         print(f"  数据分布: {data_summary}")
         
+        # 重建子图以移除所有曲线和图例
+        self.create_subplots()
         self.update_plot()
     
     def get_device_statistics(self, device_id):
@@ -630,7 +805,7 @@ class PlotWidget(QWidget):
             
             print(f"数据导出完成: {file_path}")
             return True
-            
+        
         except Exception as e:
             print(f"数据导出失败: {e}")
             return False
@@ -7,50 +7,568 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QGroupBox, QSpinBox, QDoubleSpinBox, QComboBox, QCheckBox,
-    QTextEdit, QTableWidget, QTableWidgetItem, QHeaderView,
-    QSlider, QProgressBar, QTabWidget, QFrame, QScrollArea
+    QTextEdit, QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
+    QSlider, QProgressBar, QTabWidget, QFrame, QScrollArea,
+    QMessageBox, QFileDialog, QDialog, QDialogButtonBox, QFormLayout,
+    QAbstractItemView
+)
+from PySide6.QtCore import (
+    Qt, QTimer, QElapsedTimer, Signal, Slot, QObject, QThread,
+    QAbstractTableModel, QModelIndex
 )
-from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtGui import QFont
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+import logging
+import math
+import threading
 import time
+import numpy as np
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from utils.log_filters import RateLimitFilter
+
+# 采集热路径日志走logging：调试信息默认不输出，错误信息限流，避免逐次打印阻塞采集和界面
+log = logging.getLogger(__name__)
+log.addFilter(RateLimitFilter(interval=1.0))
+
 try:
     from component.lms_filter import LMSFilter, AdaptiveLMSFilter
     from component.dual_path_processor import DualPathProcessor, NoiseSuppressionMode
 except ImportError as e:
-    print(f"导入滤波器组件失败: {e}")
+    log.warning("导入滤波器组件失败: %s", e)
     LMSFilter = None
     AdaptiveLMSFilter = None
     DualPathProcessor = None
     NoiseSuppressionMode = None
 
+from utils.sample_logger import SampleLogger
+
+# 热路径中使用的功率格式化函数（预绑定%格式化，单个数值时比str.format和f-string更快）
+_POWER_FMT = "%.6e".__mod__
+_POWER_FMT_W = "%.6e W".__mod__
+_POWER_FMT_FILTERED = "%.6e W (滤波)".__mod__
+
+# 停止时未按时结束的采集线程（保持引用直到线程结束）
+_detached_threads = set()
+
+# 滤波性能统计行：设备ID, SNR改善(dB), 降噪(%), 样本数
+_PERF_LINE_FMT = "%s: SNR+%.1fdB, 降噪%.1f%%, 样本%d"
+
+# 状态标签样式表（常量，配合_set_text_if_changed只在状态切换时调用setStyleSheet）
+_QSS_OK = "color: #2E7D32; font-weight: bold;"
+_QSS_WARN = "color: #FF9800; font-weight: bold;"
+_QSS_INFO = "color: #2196F3; font-style: italic;"
+_QSS_IDLE = "color: #666; font-style: italic;"
+_QSS_CAL_IDLE = "font-size: 10px; color: #666;"
+_QSS_CAL_DONE = "font-size: 10px; color: #2E7D32; font-weight: bold;"
+
+
+class PowerTableModel(QAbstractTableModel):
+    """实时功率数据表格模型 - 固定容量的环形缓冲区，仅保留最新的若干行"""
+    
+    HEADERS = ["时间", "设备", "功率 (W)"]
+    
+    def __init__(self, max_rows=100, parent=None):
+        super().__init__(parent)
+        self._capacity = max_rows
+        self._times = np.zeros(max_rows, dtype=np.float64)
+        self._devices = np.empty(max_rows, dtype=object)
+        self._powers = np.zeros(max_rows, dtype=np.float64)
+        self._power_text = np.empty(max_rows, dtype=object)  # 首次显示时格式化并缓存
+        self._head = 0   # 下一次写入位置
+        self._count = 0  # 当前有效行数
+        
+        # 按秒缓存格式化后的时间字符串
+        self._last_sec = -1
+        self._last_sec_str = ""
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+        
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+        
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        按需格式化单元格文本
+        
+        行数据以原始数值保存，Qt只对视口内可见的单元格调用data()，
+        因此格式化开销与可见行数相关，而与总行数无关。
+        """
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        
+        # 第0行为最旧数据
+        slot = (self._head - self._count + index.row()) % self._capacity
+        column = index.column()
+        if column == 0:
+            return self.format_time(self._times[slot])
+        if column == 1:
+            return self._devices[slot]
+        text = self._power_text[slot]
+        if text is None:
+            # 每个采样只格式化一次，滚动和重绘时直接复用
+            text = self._power_text[slot] = _POWER_FMT(self._powers[slot])
+        return text
+        
+    def format_time(self, timestamp):
+        """格式化时间戳，同一秒内复用上次的strftime结果"""
+        sec = int(timestamp)
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_sec_str = time.strftime("%H:%M:%S", time.localtime(sec))
+        return self._last_sec_str
+        
+    def append(self, timestamp, device_id, power):
+        """追加一行数据，超出上限时覆盖最旧的一行"""
+        self.extend([(timestamp, device_id, power)])
+        
+    def extend(self, rows):
+        """
+        批量追加多行数据，整批只发出一次通知
+        
+        参数:
+            rows (list): (时间戳, 设备ID, 功率) 元组列表
+        """
+        rows = list(rows)[-self._capacity:]
+        if not rows:
+            return
+        
+        # 未满时新增的行需要插入通知，其余只是覆盖旧数据
+        added = min(len(rows), self._capacity - self._count)
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), self._count, self._count + added - 1)
+        
+        for timestamp, device_id, power in rows:
+            head = self._head
+            self._times[head] = timestamp
+            self._devices[head] = device_id
+            self._powers[head] = power
+            self._power_text[head] = None
+            self._head = (head + 1) % self._capacity
+        self._count += added
+        
+        if added > 0:
+            self.endInsertRows()
+        
+        # 发生覆盖时所有行整体上移一位，只发出一次dataChanged
+        if added < len(rows):
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self._count - 1, len(self.HEADERS) - 1),
+                [Qt.DisplayRole]
+            )
+        
+    def clear(self):
+        """清空所有数据"""
+        self.beginResetModel()
+        self._devices[:] = None
+        self._power_text[:] = None
+        self._head = 0
+        self._count = 0
+        self.endResetModel()
+
+
+class AcquisitionWorker(QObject):
+    """数据采集工作对象 - 在独立线程中轮询设备功率"""
+    
+    # 信号定义
+    samples_ready = Signal(float, dict, dict)  # 时间戳, {设备ID: 功率}, {设备ID: (滤波后功率, 噪声估计, 处理信息)}
+    poll_overrun = Signal(int, int)  # 本次采集耗时(ms), 采集间隔(ms)
+    
+    # 自适应采集参数
+    STABLE_THRESHOLD = 1e-3   # 相对变化小于该值视为稳定
+    STABLE_SAMPLES = 16       # 连续稳定次数达到该值后加倍采集间隔
+    MAX_BACKOFF = 8           # 采集间隔最多放大到设定值的倍数
+    MAX_PARALLEL_READS = 8    # 并行读取的最大设备数
+    STOP_CHECK_S = 0.1        # 等待并行读取时检查停止请求的间隔（秒）
+    
+    def __init__(self, devices, interval_ms, adaptive=False, filters=None):
+        """
+        初始化采集工作对象
+        
+        参数:
+            devices (dict): 设备ID -> PM100D设备对象
+            interval_ms (int): 采集间隔（毫秒）
+            adaptive (bool): 功率稳定时是否自动降低采集频率
+            filters (tuple): (设备ID -> 噪声处理器, 主设备ID -> 参考设备ID)，None表示不滤波
+        """
+        super().__init__()
+        self._devices = tuple(devices.items())  # ((设备ID, 设备对象), ...) 不可变快照
+        self._filters = filters
+        self._base_interval = interval_ms / 1000.0
+        self._interval = self._base_interval
+        self._timer = None
+        self._executor = None  # 多设备时并行读取功率的线程池
+        self._inflight = {}    # 设备ID -> 超时未完成的读取任务
+        self._stop_requested = threading.Event()  # 界面线程请求停止（线程安全，不经过事件循环）
+        self._stopwatch = QElapsedTimer()
+        
+        # 时间戳基准：高精度单调时钟(perf_counter)起点及对应的墙上时间
+        self._t0 = 0.0
+        self._wall0 = 0.0
+        
+        # 调度基准：当前间隔的起算时间和已调度的周期数
+        self._sched_t0 = 0.0
+        self._n = 0
+        
+        # 自适应采集状态
+        self._adaptive = adaptive
+        self._last_power = {}
+        self._stable_count = 0
+        
+    @Slot()
+    def start(self):
+        """在工作线程中创建单次定时器并立即开始第一次采集"""
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        
+        self._t0 = time.perf_counter()
+        self._wall0 = time.time()
+        self._sched_t0 = self._t0
+        self._n = 0
+        self._timer.start(0)
+        
+    def request_stop(self):
+        """请求停止采集（可在任意线程调用）：正在等待的并行读取会尽快放弃，不再调度下一次采集"""
+        self._stop_requested.set()
+        
+    @Slot()
+    def stop(self):
+        """停止轮询定时器并关闭读取线程池（不等待未完成的读取，它们在后台自行结束）"""
+        self._stop_requested.set()
+        if self._timer is not None:
+            self._timer.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._inflight.clear()
+            
+    @Slot()
+    def _tick(self):
+        """执行一次采集，并按 t0 + n*interval 计算下一次触发时间，补偿累计漂移"""
+        self._stopwatch.start()
+        raw_data = self.poll()
+        
+        # 采集耗时超过间隔时报告超时，错过的周期在下面的调度中直接跳过
+        elapsed_ms = self._stopwatch.elapsed()
+        interval_ms = int(self._interval * 1000)
+        if elapsed_ms > interval_ms:
+            log.warning("采集超时: 耗时 %d ms, 间隔 %d ms", elapsed_ms, interval_ms)
+            self.poll_overrun.emit(elapsed_ms, interval_ms)
+        
+        if self._stop_requested.is_set():
+            return
+        
+        if self._adaptive:
+            self._adapt_interval(raw_data)
+        
+        now = time.perf_counter()
+        self._n += 1
+        next_fire = self._sched_t0 + self._n * self._interval
+        if next_fire < now:
+            # 采集耗时超过间隔时跳过错过的周期，避免连续补采
+            self._n = int((now - self._sched_t0) / self._interval) + 1
+            next_fire = self._sched_t0 + self._n * self._interval
+        
+        self._timer.start(max(0, int((next_fire - now) * 1000)))
+        
+    def _adapt_interval(self, raw_data):
+        """所有设备功率持续稳定时加倍采集间隔，任一设备明显变化时恢复设定间隔"""
+        stable = bool(raw_data)
+        for device_id, power in raw_data.items():
+            last = self._last_power.get(device_id)
+            if last is None or abs(power - last) >= self.STABLE_THRESHOLD * abs(last):
+                stable = False
+        self._last_power = raw_data
+        
+        if not stable:
+            self._stable_count = 0
+            if self._interval != self._base_interval:
+                log.info("功率变化，采集间隔恢复为 %.3f s", self._base_interval)
+                self._set_interval(self._base_interval)
+            return
+        
+        self._stable_count += 1
+        max_interval = self._base_interval * self.MAX_BACKOFF
+        if self._stable_count >= self.STABLE_SAMPLES and self._interval < max_interval:
+            self._stable_count = 0
+            self._set_interval(min(max_interval, self._interval * 2))
+            log.info("功率稳定，采集间隔调整为 %.3f s", self._interval)
+            
+    def _set_interval(self, interval):
+        """修改采集间隔，并以当前周期的计划时间作为新的调度起点"""
+        self._sched_t0 += self._n * self._interval
+        self._n = 0
+        self._interval = interval
+        
+    def timestamp(self):
+        """基于单调时钟的时间戳（换算到墙上时间基准，便于显示和导出）"""
+        return self._wall0 + (time.perf_counter() - self._t0)
+        
+    @Slot(dict)
+    def set_devices(self, devices):
+        """更新需要采集的设备（整体替换快照，轮询中不会遇到字典被修改）"""
+        self._devices = tuple(devices.items())
+        
+    @Slot(object)
+    def set_filters(self, filters):
+        """更新滤波配置（处理器和配对关系的快照，None表示不滤波）"""
+        self._filters = filters
+        
+    def _apply_filters(self, raw_data):
+        """
+        在采集线程中对本轮数据执行噪声滤波
+        
+        返回:
+            dict: 设备ID -> (滤波后功率, 噪声估计, 处理信息)，只包含滤波成功的设备
+        """
+        filters = self._filters
+        if filters is None or not raw_data:
+            return {}
+        
+        processors, mapping = filters
+        results = {}
+        for device_id, raw_power in raw_data.items():
+            processor = processors.get(device_id)
+            if processor is None:
+                continue
+            
+            # 获取参考信号
+            ref_device_id = mapping.get(device_id)
+            ref_power = raw_data.get(ref_device_id, raw_power) if ref_device_id else raw_power
+            
+            try:
+                filtered_power, proc_info = processor.process_sample(raw_power, ref_power)
+                noise_estimate = proc_info.get('noise_estimate', 0.0)
+                results[device_id] = (filtered_power, noise_estimate, proc_info)
+                
+                log.debug("设备 %s 滤波处理: 原始=%.6eW, 滤波后=%.6eW, 噪声估计=%.6eW",
+                          device_id, raw_power, filtered_power, noise_estimate)
+                
+            except Exception as e:
+                # 滤波失败时使用原始数据
+                log.warning("设备 %s 滤波处理失败: %s", device_id, e)
+        return results
+        
+    @staticmethod
+    def _read_power(item):
+        """读取单个设备的功率，失败时返回 (设备ID, None)"""
+        device_id, device = item
+        try:
+            log.debug("正在采集设备 %s 的数据...", device_id)
+            power = device.getPower()
+            log.debug("设备 %s 功率值: %.6e W", device_id, power)
+            return device_id, power
+            
+        except Exception as e:
+            log.warning("采集设备 %s 数据失败: %s", device_id, e)
+            return device_id, None
+            
+    def _poll_devices(self, devices):
+        """
+        在读取线程池中读取设备的功率（单个设备也经过线程池）
+        
+        各设备使用独立的VISA会话，多设备并行读取，总耗时约为最慢设备的读取时间。
+        单个设备在一个采集间隔内未返回时本轮放弃其数据，且在其完成前不再重复提交读取；
+        收到停止请求时立即返回，挂起的读取不会拖住采集线程的退出。
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.MAX_PARALLEL_READS, thread_name_prefix="PowerRead"
+            )
+        
+        futures = {}
+        for item in devices:
+            device_id = item[0]
+            pending = self._inflight.get(device_id)
+            if pending is not None:
+                if not pending.done():
+                    log.debug("设备 %s 上次读取尚未完成，本轮跳过", device_id)
+                    continue
+                del self._inflight[device_id]
+            futures[device_id] = self._executor.submit(self._read_power, item)
+        
+        # 分段等待，期间收到停止请求时立即放弃本轮读取
+        deadline = time.perf_counter() + self._interval
+        pending = set(futures.values())
+        done = set()
+        while pending and not self._stop_requested.is_set():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            finished, pending = wait(pending, timeout=min(remaining, self.STOP_CHECK_S))
+            done |= finished
+        
+        raw_data = {}
+        for device_id, future in futures.items():
+            if future in done:
+                _, power = future.result()
+                if power is not None:
+                    raw_data[device_id] = power
+            else:
+                self._inflight[device_id] = future
+                log.warning("设备 %s 读取超时（超过 %.3f s）", device_id, self._interval)
+        return raw_data
+        
+    @Slot()
+    def poll(self):
+        """读取所有设备的功率并执行滤波，结果发送到GUI线程"""
+        current_time = self.timestamp()
+        log.debug("开始数据采集 - 时间戳: %s", current_time)
+        log.debug("采集设备数量: %d", len(self._devices))
+        
+        raw_data = self._poll_devices(self._devices)
+        
+        self.samples_ready.emit(current_time, raw_data, self._apply_filters(raw_data))
+        return raw_data
+
+
+class TextExportThread(QThread):
+    """文本文件写入线程：报告内容在界面线程生成，磁盘写入放到后台，避免阻塞界面"""
+    export_finished = Signal(str, str)  # (文件路径, 错误信息，成功时为空字符串)
+    
+    def __init__(self, file_path, text, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.text = text
+    
+    def run(self):
+        """写入文件"""
+        try:
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                f.write(self.text)
+        except Exception as e:
+            self.export_finished.emit(self.file_path, str(e))
+        else:
+            self.export_finished.emit(self.file_path, "")
+
+
+class LmsTestThread(QThread):
+    """
+    滤波器测试线程：向各处理器输入模拟信号，LMS计算在后台完成
+    
+    线程对象创建一次、每次测试重新start；随机数发生器和信号缓冲区随对象复用
+    """
+    results_ready = Signal(list)  # 每个设备一行测试结果
+    
+    TEST_SAMPLES = 100
+    
+    def __init__(self, parent=None):
+        """初始化测试线程"""
+        super().__init__(parent)
+        self.processors = {}  # 设备ID -> 处理器 的快照，start前设置
+        self._rng = np.random.default_rng()
+        self._test_main = np.empty(self.TEST_SAMPLES)
+        self._test_ref = np.empty(self.TEST_SAMPLES)
+        self._test_out = np.empty(self.TEST_SAMPLES)
+    
+    def run(self):
+        """生成测试信号并计算各处理器的改善量"""
+        test_main = self._test_main
+        test_ref = self._test_ref
+        test_out = self._test_out
+        
+        test_results = []
+        for device_id, processor in self.processors.items():
+            # 生成测试信号（原地写入缓冲区）
+            self._rng.standard_normal(out=test_main)
+            test_main *= 0.1
+            test_main += 1.0  # 主信号
+            self._rng.standard_normal(out=test_ref)
+            test_ref *= 0.05  # 参考信号（噪声）
+            
+            # 测试滤波（整段批量处理，处理器内部加锁，可与采集线程并发）
+            processor.process_block(test_main, test_ref, out=test_out)
+            
+            # 计算改善
+            original_std = test_main.std().item()
+            filtered_std = test_out.std().item()
+            # math.log10 对0会抛出ValueError，任一标准差为0（如恒定信号）时改善记为0
+            if original_std > 0 and filtered_std > 0:
+                improvement = 20.0 * math.log10(original_std / filtered_std)
+            else:
+                improvement = 0.0
+            
+            test_results.append(f"{device_id}: {improvement:.1f}dB")
+        
+        self.results_ready.emit(test_results)
+
 
 class RightPanel(QWidget):
     """右侧面板类 - 设备控制和状态显示"""
     
     # 信号定义
     acquisition_stopped = Signal()  # 数据采集停止信号
+    acquisition_devices_changed = Signal(dict)  # 采集设备变化信号（发往采集线程）
+    acquisition_filters_changed = Signal(object)  # 滤波配置变化信号（发往采集线程）
+    
+    # 参数输入防抖间隔（毫秒）
+    SETTING_DEBOUNCE_MS = 250
+    # 拖动LMS参数滑块时合并更新的延迟（毫秒）
+    LMS_PARAM_DEBOUNCE_MS = 50
+    # 停止采集时等待采集线程结束的最长时间（毫秒）。读取在线程池中进行，
+    # 采集线程在 STOP_CHECK_S 内响应停止请求，无需等待挂起的VISA读取
+    ACQ_STOP_TIMEOUT_MS = 500
+    
+    # 设备设置方法 -> 参数缓存键
+    PARAM_SETTERS = {
+        'setWavelength': 'wavelength',
+        'setBandwidth': 'bandwidth',
+        'setAvgCount': 'avg_count',
+        'setRangeAuto': 'range_auto',
+    }
     
     def __init__(self):
         super().__init__()
         self.connected_devices = {}
         self.plot_widget = None  # 绘图组件引用
         self.main_window = None  # 主窗口引用
-        
-        # 数据采集定时器
-        self.data_timer = QTimer()
-        self.data_timer.timeout.connect(self.collect_data)
+        self._status_bar = None  # 主窗口状态栏
+        self._status_label = None  # 主窗口采集状态标签
+        self._plot_widget = None  # 采集期间缓存的绘图组件引用
+        self._selected_cache = []  # 选中设备ID列表缓存（按设备列表顺序）
+        self._selected_ids = set()  # 选中设备ID集合，复选框切换时增量更新
+        self._device_params = {}  # 设备ID -> 参数缓存（避免切换选择时重复查询设备）
+        self._widget_state = {}  # (控件, 属性) -> 上次设置的文本/样式，未变化时跳过更新
+        self.sample_logger = SampleLogger()  # 实时记录（后台线程写文件）
+        
+        # 数据采集线程
+        self._acq_thread = None
+        self._acq_worker = None
         
         # 滤波器系统
         self.filter_enabled = False
-        self.noise_processors = {}  # 设备ID -> DualPathProcessor
+        self.noise_processors = {}  # 设备ID -> DualPathProcessor（lms_filter属性总存在，未使用LMS时为None）
+        # 设备ID -> (处理器, 指标版本号, SNR改善, 噪声抑制率, 是否收敛, 统计行)，指标未变时复用
+        self._perf_cache = {}
+        self._lms_test_thread = None  # 滤波器测试线程，首次测试时创建
+        self._current_mode = None  # 当前抑制模式（下拉框选中项数据的缓存）
+        # 性能监控页；不在当前页时跳过性能刷新，只记下待刷新，切换到该页时补一次
+        self._perf_tab = None
+        self._perf_dirty = False
         self.main_reference_mapping = {}  # 主信号设备 -> 参考信号设备的映射
-        self.filter_performance_timer = QTimer()
+        # 每2秒更新一次滤波性能，只在采集中且滤波启用时运行（精度要求低，使用粗粒度定时器）
+        self.filter_performance_timer = QTimer(self)
+        self.filter_performance_timer.setInterval(2000)
+        self.filter_performance_timer.setTimerType(Qt.VeryCoarseTimer)
         self.filter_performance_timer.timeout.connect(self.update_filter_performance)
-        self.filter_performance_timer.start(2000)  # 每2秒更新一次滤波性能
+        
+        # 标定进度定时器（创建一次，每次标定复用）
+        self.calibration_progress_value = 0
+        self.calibration_timer = QTimer(self)
+        self.calibration_timer.setInterval(100)
+        self.calibration_timer.timeout.connect(self._on_calibration_tick)
         
         self.init_ui()
     
@@ -60,8 +578,10 @@ class RightPanel(QWidget):
         print(f"RightPanel: 绘图组件引用已设置 - {plot_widget is not None}")
     
     def set_main_window(self, main_window):
-        """设置主窗口引用"""
+        """设置主窗口引用，并一次性绑定状态栏控件"""
         self.main_window = main_window
+        self._status_bar = getattr(main_window, 'status_bar', None)
+        self._status_label = getattr(main_window, 'acquisition_status_label', None)
         print(f"RightPanel: 主窗口引用已设置 - {main_window is not None}")
         
     def init_ui(self):
@@ -131,7 +651,6 @@ class RightPanel(QWidget):
         device_layout.addWidget(info_label)
         
         # 设备选择复选框容器
-        from PySide6.QtWidgets import QScrollArea
         scroll_area = QScrollArea()
         scroll_area.setMaximumHeight(120)
         scroll_area.setWidgetResizable(True)
@@ -169,7 +688,11 @@ class RightPanel(QWidget):
         
         # 选中设备状态
         self.selected_devices_label = QLabel("已选中设备: 0")
-        self.selected_devices_label.setStyleSheet("font-weight: bold; color: #2E7D32; margin-top: 5px;")
+        self.selected_devices_label.setStyleSheet(
+            "QLabel { font-weight: bold; color: #999; margin-top: 5px; }"
+            "QLabel[hasSel=\"true\"] { color: #2E7D32; }"
+        )
+        self.selected_devices_label.setProperty("hasSel", False)
         device_layout.addWidget(self.selected_devices_label)
         
         parent_layout.addWidget(device_group)
@@ -184,13 +707,20 @@ class RightPanel(QWidget):
         tip_label.setStyleSheet("color: #666; font-size: 10px; font-style: italic; margin-bottom: 5px;")
         control_layout.addWidget(tip_label)
         
+        # 选择变化后刷新控件值，0ms单次定时器把连续的多次切换合并为一次
+        self._controls_refresh_timer = QTimer(self)
+        self._controls_refresh_timer.setSingleShot(True)
+        self._controls_refresh_timer.setInterval(0)
+        self._controls_refresh_timer.timeout.connect(self.update_controls_from_selected_devices)
+        
         # 波长设置
         wavelength_layout = QHBoxLayout()
         wavelength_layout.addWidget(QLabel("波长 (nm):"))
         self.wavelength_spinbox = QSpinBox()
         self.wavelength_spinbox.setRange(400, 1100)
         self.wavelength_spinbox.setValue(1550)
-        self.wavelength_spinbox.valueChanged.connect(self.set_wavelength)
+        self.wavelength_spinbox.setKeyboardTracking(False)  # 键盘输入完成（回车或失去焦点）后才发出valueChanged
+        self.wavelength_spinbox.valueChanged.connect(partial(self._schedule_apply, 'setWavelength'))
         wavelength_layout.addWidget(self.wavelength_spinbox)
         control_layout.addLayout(wavelength_layout)
         
@@ -199,7 +729,7 @@ class RightPanel(QWidget):
         bandwidth_layout.addWidget(QLabel("带宽:"))
         self.bandwidth_combo = QComboBox()
         self.bandwidth_combo.addItems(["LO", "HI"])
-        self.bandwidth_combo.currentTextChanged.connect(self.set_bandwidth)
+        self.bandwidth_combo.currentTextChanged.connect(partial(self._schedule_apply, 'setBandwidth'))
         bandwidth_layout.addWidget(self.bandwidth_combo)
         control_layout.addLayout(bandwidth_layout)
         
@@ -209,16 +739,31 @@ class RightPanel(QWidget):
         self.avg_spinbox = QSpinBox()
         self.avg_spinbox.setRange(1, 1000)
         self.avg_spinbox.setValue(10)
-        self.avg_spinbox.valueChanged.connect(self.set_avg_count)
+        self.avg_spinbox.setKeyboardTracking(False)
+        self.avg_spinbox.valueChanged.connect(partial(self._schedule_apply, 'setAvgCount'))
         avg_layout.addWidget(self.avg_spinbox)
         control_layout.addLayout(avg_layout)
         
         # 自动量程
         self.auto_range_checkbox = QCheckBox("自动量程")
         self.auto_range_checkbox.setChecked(True)
-        self.auto_range_checkbox.toggled.connect(self.set_auto_range)
+        self.auto_range_checkbox.toggled.connect(partial(self._schedule_apply, 'setRangeAuto'))
         control_layout.addWidget(self.auto_range_checkbox)
         
+        # 设备设置方法 -> (控件, 读取控件值的方法名)
+        self._ctrl_map = {
+            'setWavelength': (self.wavelength_spinbox, 'value'),
+            'setBandwidth': (self.bandwidth_combo, 'currentText'),
+            'setAvgCount': (self.avg_spinbox, 'value'),
+            'setRangeAuto': (self.auto_range_checkbox, 'isChecked'),
+        }
+        # 参数输入防抖：停止调整后才写入设备，避免每个中间值都触发一次SCPI写入
+        # 自动量程为单次切换，不需要防抖
+        self._apply_timers = {
+            name: self._create_debounce_timer(partial(self._apply_control, name))
+            for name in ('setWavelength', 'setBandwidth', 'setAvgCount')
+        }
+        
         # 选中设备操作按钮
         selected_device_layout = QHBoxLayout()
         self.sync_selected_button = QPushButton("同步选中设备")
@@ -241,7 +786,10 @@ class RightPanel(QWidget):
         self.auto_save_checkbox.toggled.connect(self.on_auto_save_toggled)
         control_layout.addWidget(self.auto_save_checkbox)
         
-
+        # 实时记录选项
+        self.stream_log_checkbox = QCheckBox("采集时实时记录到文件")
+        self.stream_log_checkbox.setChecked(False)
+        control_layout.addWidget(self.stream_log_checkbox)
         
         # 初始状态禁用控件
         self.set_controls_enabled(False)
@@ -258,14 +806,30 @@ class RightPanel(QWidget):
         power_layout.addWidget(QLabel("当前功率:"))
         self.power_label = QLabel("-- W")
         self.power_label.setStyleSheet("QLabel { font-size: 16px; font-weight: bold; color: #2E7D32; }")
+        self._last_power_text = self.power_label.text()
         power_layout.addWidget(self.power_label)
         power_layout.addStretch()
         data_layout.addLayout(power_layout)
         
         # 数据表格
-        self.data_table = QTableWidget(0, 3)
-        self.data_table.setHorizontalHeaderLabels(["时间", "设备", "功率 (W)"])
-        self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.data_model = PowerTableModel(max_rows=100, parent=self)
+        self.data_table = QTableView()
+        self.data_table.setModel(self.data_model)
+        self.data_table.verticalHeader().setVisible(False)
+        # 固定行高，避免视图逐行测量内容高度
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.verticalHeader().setDefaultSectionSize(18)
+        # 不换行、不画网格线，减少每行绘制时的文本测量和重绘量
+        self.data_table.setWordWrap(False)
+        self.data_table.setShowGrid(False)
+        self.data_table.setAlternatingRowColors(False)
+        self.data_table.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        # 固定列宽，避免每次插入数据时重新计算表头宽度
+        self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.setColumnWidth(0, 80)
+        self.data_table.setColumnWidth(1, 120)
+        self.data_table.setColumnWidth(2, 120)
+        self.data_table.setSortingEnabled(False)
         self.data_table.setMaximumHeight(150)
         self.data_table.setMinimumHeight(100)
         data_layout.addWidget(self.data_table)
@@ -287,6 +851,12 @@ class RightPanel(QWidget):
         interval_layout.addWidget(self.interval_spinbox)
         acq_layout.addLayout(interval_layout)
         
+        # 自适应采集间隔
+        self.adaptive_interval_checkbox = QCheckBox("功率稳定时自动降低采集频率")
+        self.adaptive_interval_checkbox.setToolTip("连续稳定时采集间隔逐步加倍（最多为设定值的8倍），功率变化时立即恢复")
+        self.adaptive_interval_checkbox.setChecked(False)
+        acq_layout.addWidget(self.adaptive_interval_checkbox)
+        
         # 控制按钮
         button_layout = QHBoxLayout()
         self.start_button = QPushButton("开始采集")
@@ -307,68 +877,118 @@ class RightPanel(QWidget):
         parent_layout.addWidget(acq_group)
         
     def update_device_list(self, devices):
-        """更新设备选择栏"""
+        """更新设备选择栏（只增删变化的设备，保留已有复选框及其选中状态）"""
         # 保存当前选中的设备
         previously_selected = self.get_selected_devices()
         
-        # 清除现有的复选框
-        for device_id, checkbox in self.device_checkboxes.items():
-            self.device_checkboxes_layout.removeWidget(checkbox)
-            checkbox.deleteLater()
-        self.device_checkboxes.clear()
+        removed = self.device_checkboxes.keys() - devices.keys()
+        added = devices.keys() - self.device_checkboxes.keys()
+        
+        # 断开或重新连接（设备对象变化）的设备需要重新读取参数
+        for device_id in list(self._device_params):
+            old_info = self.connected_devices.get(device_id)
+            new_info = devices.get(device_id)
+            if new_info is None or old_info is None or new_info['device'] is not old_info['device']:
+                del self._device_params[device_id]
         
         # 更新连接的设备
         self.connected_devices = devices
         
-        if not devices:
-            # 没有设备时显示空状态
-            self.no_devices_label.show()
-            self.select_all_button.setEnabled(False)
-            self.select_none_button.setEnabled(False)
-            self.set_controls_enabled(False)
-        else:
-            # 隐藏空状态标签
-            self.no_devices_label.hide()
+        # 批量增删复选框期间暂停容器重绘
+        self.device_checkboxes_widget.setUpdatesEnabled(False)
+        try:
+            # 移除已断开设备的复选框
+            for device_id in removed:
+                self._selected_ids.discard(device_id)
+                checkbox = self.device_checkboxes.pop(device_id)
+                self.device_checkboxes_layout.removeWidget(checkbox)
+                checkbox.deleteLater()
             
-            # 为每个设备创建复选框
-            for device_id in devices.keys():
-                checkbox = QCheckBox(f"{device_id}")
-                checkbox.setToolTip(f"选择 {device_id} 进行操作和数据记录")
-                checkbox.toggled.connect(self.on_device_selection_changed)
+            if not devices:
+                # 没有设备时显示空状态
+                self.no_devices_label.show()
+                self.select_all_button.setEnabled(False)
+                self.select_none_button.setEnabled(False)
+                self.set_controls_enabled(False)
+            else:
+                # 隐藏空状态标签
+                self.no_devices_label.hide()
                 
-                # 恢复之前的选中状态
-                if device_id in previously_selected:
-                    checkbox.setChecked(True)
+                # 只为新设备创建复选框（保持设备列表顺序）
+                for device_id in devices.keys():
+                    if device_id not in added:
+                        continue
+                    
+                    checkbox = QCheckBox(f"{device_id}")
+                    checkbox.setToolTip(f"选择 {device_id} 进行操作和数据记录")
+                    checkbox.toggled.connect(partial(self._on_device_toggled, device_id))
+                    
+                    self.device_checkboxes[device_id] = checkbox
+                    self.device_checkboxes_layout.addWidget(checkbox)
                 
-                self.device_checkboxes[device_id] = checkbox
-                self.device_checkboxes_layout.addWidget(checkbox)
-            
-            self.select_all_button.setEnabled(True)
-            self.select_none_button.setEnabled(True)
+                self.select_all_button.setEnabled(True)
+                self.select_none_button.setEnabled(True)
+        finally:
+            self.device_checkboxes_widget.setUpdatesEnabled(True)
+        
+        # 仅当选中的设备确实发生变化时才刷新控件（避免多余的设备读写）
+        self.refresh_selected_devices()
+        if self._selected_cache != previously_selected:
+            self.on_device_selection_changed()
+            return
         
-        # 更新选中设备状态
-        self.update_selected_devices_display()
+        # 设备集合未变时无需刷新显示，只同步可能重新连接的设备对象
+        if removed or added:
+            self.update_selected_devices_display()
+        self.sync_acquisition_devices()
         
     def get_selected_devices(self):
-        """获取选中的设备ID列表"""
-        selected = []
-        for device_id, checkbox in self.device_checkboxes.items():
-            if checkbox.isChecked():
-                selected.append(device_id)
-        return selected
+        """获取选中的设备ID列表（返回缓存的副本）"""
+        return list(self._selected_cache)
+        
+    def refresh_selected_devices(self):
+        """按设备列表顺序重建选中设备缓存（只查选中集合，不逐个查询复选框状态）"""
+        selected_ids = self._selected_ids
+        self._selected_cache = [
+            device_id for device_id in self.device_checkboxes if device_id in selected_ids
+        ]
+        
+    def _on_device_toggled(self, device_id, checked):
+        """单个设备复选框切换：增量更新选中集合后处理选择变化"""
+        if checked:
+            self._selected_ids.add(device_id)
+        else:
+            self._selected_ids.discard(device_id)
+        self.on_device_selection_changed()
     
+    @Slot()
     def select_all_devices(self):
         """选择所有设备"""
-        for checkbox in self.device_checkboxes.values():
-            checkbox.setChecked(True)
+        self._set_all_devices_checked(True)
     
+    @Slot()
     def select_none_devices(self):
         """取消选择所有设备"""
+        self._set_all_devices_checked(False)
+        
+    def _set_all_devices_checked(self, checked):
+        """批量设置复选框状态，屏蔽逐个触发的信号，最后只处理一次选择变化"""
+        changed = False
         for checkbox in self.device_checkboxes.values():
-            checkbox.setChecked(False)
+            if checkbox.isChecked() != checked:
+                checkbox.blockSignals(True)
+                checkbox.setChecked(checked)
+                checkbox.blockSignals(False)
+                changed = True
+        
+        if changed:
+            self._selected_ids = set(self.device_checkboxes) if checked else set()
+            self.on_device_selection_changed()
             
+    @Slot()
     def on_device_selection_changed(self):
         """设备选择状态改变"""
+        self.refresh_selected_devices()
         selected_devices = self.get_selected_devices()
         has_selection = len(selected_devices) > 0
         
@@ -378,11 +998,14 @@ class RightPanel(QWidget):
         # 更新选中设备显示
         self.update_selected_devices_display()
         
-        # 如果有选中的设备，从第一个设备更新控件值
+        # 如果有选中的设备，从第一个设备更新控件值（合并同一事件循环内的多次切换）
         if has_selection:
-            self.update_controls_from_selected_devices()
+            self._controls_refresh_timer.start()
+        
+        # 采集进行中时同步采集设备
+        self.sync_acquisition_devices()
         
-        print(f"设备选择已更改: {selected_devices}")
+        log.debug("设备选择已更改: %s", selected_devices)
     
     def update_selected_devices_display(self):
         """更新选中设备状态显示"""
@@ -390,11 +1013,32 @@ class RightPanel(QWidget):
         count = len(selected_devices)
         
         if count == 0:
-            self.selected_devices_label.setText("已选中设备: 0")
-            self.selected_devices_label.setStyleSheet("font-weight: bold; color: #999; margin-top: 5px;")
+            self._set_text_if_changed(self.selected_devices_label, "已选中设备: 0")
         else:
-            self.selected_devices_label.setText(f"已选中设备: {count} ({', '.join(selected_devices)})")
-            self.selected_devices_label.setStyleSheet("font-weight: bold; color: #2E7D32; margin-top: 5px;")
+            self._set_text_if_changed(self.selected_devices_label,
+                                      f"已选中设备: {count} ({', '.join(selected_devices)})")
+        
+        # 样式表已在创建时设置，这里只切换动态属性并重新应用样式
+        has_selection = count > 0
+        if self.selected_devices_label.property("hasSel") != has_selection:
+            self.selected_devices_label.setProperty("hasSel", has_selection)
+            style = self.selected_devices_label.style()
+            style.unpolish(self.selected_devices_label)
+            style.polish(self.selected_devices_label)
+            
+    def _set_text_if_changed(self, widget, text, style=None):
+        """文本（及可选的样式表）与上次设置的不同时才更新控件，避免重复失效和重绘"""
+        state = self._widget_state
+        if state.get((widget, 'text')) != text:
+            # QTextEdit.setText会先判断是否为富文本，纯文本直接用setPlainText
+            if isinstance(widget, QTextEdit):
+                widget.setPlainText(text)
+            else:
+                widget.setText(text)
+            state[(widget, 'text')] = text
+        if style is not None and state.get((widget, 'style')) != style:
+            widget.setStyleSheet(style)
+            state[(widget, 'style')] = style
             
     def set_controls_enabled(self, enabled):
         """设置控件启用状态"""
@@ -407,6 +1051,7 @@ class RightPanel(QWidget):
         self.sync_selected_button.setEnabled(enabled)
         self.zero_selected_button.setEnabled(enabled)
         
+    @Slot()
     def update_controls_from_selected_devices(self):
         """从选中的设备更新控件值（使用第一个选中设备的参数）"""
         selected_devices = self.get_selected_devices()
@@ -418,64 +1063,122 @@ class RightPanel(QWidget):
         if first_device_id not in self.connected_devices:
             return
             
+        # 同步期间屏蔽控件信号，避免把刚读出的值再写回设备
+        controls = (self.wavelength_spinbox, self.bandwidth_combo,
+                    self.avg_spinbox, self.auto_range_checkbox)
+        for widget in controls:
+            widget.blockSignals(True)
+            
         try:
-            device = self.connected_devices[first_device_id]['device']
-            # 更新控件值以匹配第一个选中设备的当前状态
-            self.wavelength_spinbox.setValue(int(device.getWavelength()))
-            self.bandwidth_combo.setCurrentText(device.getBandwidth())
-            self.avg_spinbox.setValue(device.getAvgCount())
-            self.auto_range_checkbox.setChecked(device.getRangeAuto())
+            # 更新控件值以匹配第一个选中设备的当前状态（优先使用参数缓存）
+            params = self.get_device_params(first_device_id)
+            self.wavelength_spinbox.setValue(int(params['wavelength']))
+            self.bandwidth_combo.setCurrentText(params['bandwidth'])
+            self.avg_spinbox.setValue(params['avg_count'])
+            self.auto_range_checkbox.setChecked(params['range_auto'])
             
-            print(f"控件已更新为设备 {first_device_id} 的参数")
+            log.debug("控件已更新为设备 %s 的参数", first_device_id)
         except Exception as e:
-            print(f"更新控件失败: {e}")
+            log.warning("更新控件失败: %s", e)
+        finally:
+            for widget in controls:
+                widget.blockSignals(False)
             
-    def set_wavelength(self):
-        """设置波长到选中的设备"""
-        self._apply_to_selected_devices('setWavelength', self.wavelength_spinbox.value())
-                
-    def set_bandwidth(self):
-        """设置带宽到选中的设备"""
-        self._apply_to_selected_devices('setBandwidth', self.bandwidth_combo.currentText())
-                
-    def set_avg_count(self):
-        """设置平均次数到选中的设备"""
-        self._apply_to_selected_devices('setAvgCount', self.avg_spinbox.value())
-                
-    def set_auto_range(self):
-        """设置自动量程到选中的设备"""
-        self._apply_to_selected_devices('setRangeAuto', self.auto_range_checkbox.isChecked())
+    def get_device_params(self, device_id):
+        """
+        获取设备参数，首次访问时从设备读取并缓存
+        
+        参数:
+            device_id (str): 设备ID
+        
+        返回:
+            dict: wavelength / bandwidth / avg_count / range_auto
+        """
+        params = self._device_params.get(device_id)
+        if params is None:
+            device = self.connected_devices[device_id]['device']
+            params = {
+                'wavelength': device.getWavelength(),
+                'bandwidth': device.getBandwidth(),
+                'avg_count': device.getAvgCount(),
+                'range_auto': device.getRangeAuto(),
+            }
+            self._device_params[device_id] = params
+        return params
+        
+    def _update_cached_param(self, device_id, method_name, value):
+        """设置成功写入设备后同步更新参数缓存"""
+        params = self._device_params.get(device_id)
+        key = self.PARAM_SETTERS.get(method_name)
+        if params is not None and key is not None:
+            params[key] = value
+            
+    def _create_debounce_timer(self, slot, interval_ms=None):
+        """创建参数写入防抖用的单次定时器（默认间隔SETTING_DEBOUNCE_MS）"""
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(self.SETTING_DEBOUNCE_MS if interval_ms is None else interval_ms)
+        timer.timeout.connect(slot)
+        return timer
+        
+    def _schedule_apply(self, method_name, *_):
+        """
+        参数控件变化时的统一入口
+        
+        有防抖定时器的参数重新计时，停止调整后再写入设备；其余参数立即写入。
+        """
+        timer = self._apply_timers.get(method_name)
+        if timer is not None:
+            timer.start()
+        else:
+            self._apply_control(method_name)
+        
+    def _apply_control(self, method_name):
+        """读取对应控件的当前值并写入选中的设备"""
+        widget, getter = self._ctrl_map[method_name]
+        self._apply_to_selected_devices(method_name, getattr(widget, getter)())
                 
     def _apply_to_selected_devices(self, method_name, value):
         """应用设置到选中设备的辅助方法"""
         selected_devices = self.get_selected_devices()
         if not selected_devices:
-            print(f"没有选中的设备，跳过 {method_name} 设置")
+            log.debug("没有选中的设备，跳过 %s 设置", method_name)
             return
             
         success_count = 0
         failed_devices = []
         
+        # 先解析各设备的设置方法，循环内只做设备写入
+        connected = self.connected_devices
+        setters = []
         for device_id in selected_devices:
+            device_info = connected.get(device_id)
+            if device_info is None:
+                log.warning("设备 %s 已断开，跳过 %s 设置", device_id, method_name)
+                failed_devices.append(device_id)
+                continue
+            setters.append((device_id, getattr(device_info['device'], method_name)))
+        
+        for device_id, method in setters:
             try:
-                device = self.connected_devices[device_id]['device']
-                method = getattr(device, method_name)
                 method(value)
+                self._update_cached_param(device_id, method_name, value)
                 success_count += 1
             except Exception as e:
-                print(f"设备 {device_id} {method_name} 设置失败: {e}")
+                log.warning("设备 %s %s 设置失败: %s", device_id, method_name, e)
                 failed_devices.append(device_id)
         
         if failed_devices:
-            print(f"设置 {method_name}={value}: 成功 {success_count} 个设备, 失败 {len(failed_devices)} 个设备 ({', '.join(failed_devices)})")
+            log.warning("设置 %s=%s: 成功 %d 个设备, 失败 %d 个设备 (%s)",
+                        method_name, value, success_count, len(failed_devices), ', '.join(failed_devices))
         else:
-            print(f"设置 {method_name}={value}: 成功应用到所有 {success_count} 个选中设备")
+            log.debug("设置 %s=%s: 成功应用到所有 %d 个选中设备", method_name, value, success_count)
                 
+    @Slot()
     def sync_selected_devices(self):
         """同步选中设备参数"""
         selected_devices = self.get_selected_devices()
         if not selected_devices:
-            from PySide6.QtWidgets import QMessageBox
             QMessageBox.information(self, "同步设备", "请先选择要同步的设备")
             return
             
@@ -494,29 +1197,33 @@ class RightPanel(QWidget):
                 device.setBandwidth(bandwidth)
                 device.setAvgCount(avg_count)
                 device.setRangeAuto(auto_range)
+                self._device_params[device_id] = {
+                    'wavelength': wavelength,
+                    'bandwidth': bandwidth,
+                    'avg_count': avg_count,
+                    'range_auto': auto_range,
+                }
                 success_count += 1
-                print(f"设备 {device_id} 参数同步成功")
+                log.debug("设备 %s 参数同步成功", device_id)
             except Exception as e:
                 failed_devices.append(device_id)
-                print(f"设备 {device_id} 参数同步失败: {e}")
+                log.warning("设备 %s 参数同步失败: %s", device_id, e)
         
         # 显示同步结果
-        from PySide6.QtWidgets import QMessageBox
         if failed_devices:
             msg = f"参数同步完成！\n\n成功: {success_count}个设备\n失败: {len(failed_devices)}个设备\n\n失败的设备: {', '.join(failed_devices)}"
             QMessageBox.warning(self, "参数同步", msg)
         else:
             QMessageBox.information(self, "参数同步", f"所有 {success_count} 个选中设备参数同步成功！\n\n设置:\n波长: {wavelength}nm\n带宽: {bandwidth}\n平均次数: {avg_count}\n自动量程: {'开启' if auto_range else '关闭'}")
             
+    @Slot()
     def zero_selected_devices(self):
         """对选中设备执行清零操作"""
         selected_devices = self.get_selected_devices()
         if not selected_devices:
-            from PySide6.QtWidgets import QMessageBox
             QMessageBox.information(self, "设备清零", "请先选择要清零的设备")
             return
             
-        from PySide6.QtWidgets import QMessageBox
         reply = QMessageBox.question(
             self, '确认清零', 
             f'确定要对选中的 {len(selected_devices)} 个设备执行清零操作吗？\n\n选中设备: {", ".join(selected_devices)}\n\n注意：清零过程中请确保所有传感器都被遮挡。',
@@ -533,13 +1240,13 @@ class RightPanel(QWidget):
         for device_id in selected_devices:
             try:
                 device = self.connected_devices[device_id]['device']
-                print(f"正在对设备 {device_id} 执行清零...")
+                log.debug("正在对设备 %s 执行清零...", device_id)
                 device.zero()
                 success_count += 1
-                print(f"设备 {device_id} 清零成功")
+                log.debug("设备 %s 清零成功", device_id)
             except Exception as e:
                 failed_devices.append(device_id)
-                print(f"设备 {device_id} 清零失败: {e}")
+                log.warning("设备 %s 清零失败: %s", device_id, e)
         
         # 显示清零结果
         if failed_devices:
@@ -548,203 +1255,296 @@ class RightPanel(QWidget):
         else:
             QMessageBox.information(self, "设备清零", f"所有 {success_count} 个选中设备清零操作完成！")
                 
+    @Slot()
     def start_acquisition(self):
         """开始数据采集"""
         selected_devices = self.get_selected_devices()
         if not selected_devices:
-            from PySide6.QtWidgets import QMessageBox
             QMessageBox.information(self, "数据采集", "请先选择要采集数据的设备")
             return
             
+        # 采集开始时解析一次绘图组件引用，避免每次采集重复查找
+        self._plot_widget = self.plot_widget
+        if self._plot_widget is None:
+            self._plot_widget = getattr(self.window(), 'plot_widget', None)
+            
+        # 实时记录在后台线程写文件，不占用采集和界面线程
+        if self.stream_log_checkbox.isChecked():
+            self.start_sample_logging()
+            
+        # 设备轮询在独立线程中进行，结果通过排队信号返回GUI线程
         interval_ms = int(self.interval_spinbox.value() * 1000)
-        self.data_timer.start(interval_ms)
+        self._acq_thread = QThread(self)
+        self._acq_worker = AcquisitionWorker(self.get_selected_device_handles(), interval_ms,
+                                             adaptive=self.adaptive_interval_checkbox.isChecked(),
+                                             filters=self.get_filter_config())
+        self._acq_worker.moveToThread(self._acq_thread)
+        self._acq_thread.started.connect(self._acq_worker.start)
+        # 线程结束时在工作线程中执行stop，关闭定时器和读取线程池
+        self._acq_thread.finished.connect(self._acq_worker.stop)
+        self._acq_thread.finished.connect(self._acq_worker.deleteLater)
+        self._acq_worker.samples_ready.connect(self._apply_samples, Qt.QueuedConnection)
+        self._acq_worker.poll_overrun.connect(self._on_poll_overrun, Qt.QueuedConnection)
+        self.acquisition_devices_changed.connect(self._acq_worker.set_devices, Qt.QueuedConnection)
+        self.acquisition_filters_changed.connect(self._acq_worker.set_filters, Qt.QueuedConnection)
+        self._acq_thread.start()
+        self.update_filter_performance_timer()
         
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.interval_spinbox.setEnabled(False)
+        self.adaptive_interval_checkbox.setEnabled(False)
+        self.stream_log_checkbox.setEnabled(False)
         
         # 更新状态栏
-        if self.main_window and hasattr(self.main_window, 'acquisition_status_label'):
+        if self._status_label is not None:
             auto_save_status = "开启" if self.auto_save_checkbox.isChecked() else "关闭"
             device_count = len(selected_devices)
-            self.main_window.acquisition_status_label.setText(f"数据采集: 运行中 ({device_count}个设备, 自动保存: {auto_save_status})")
+            self._status_label.setText(f"数据采集: 运行中 ({device_count}个设备, 自动保存: {auto_save_status})")
         
         print(f"开始数据采集 - 选中设备: {', '.join(selected_devices)}")
         
+    @Slot()
     def stop_acquisition(self):
         """停止数据采集"""
-        self.data_timer.stop()
+        # 只有采集确实在运行时才触发自动保存，避免重复停止时重复发信号
+        was_running = self._acq_worker is not None
+        self.shutdown_acquisition()
         
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.interval_spinbox.setEnabled(True)
+        self.adaptive_interval_checkbox.setEnabled(True)
+        self.stream_log_checkbox.setEnabled(True)
         
-        print(f"停止采集 - 自动保存开关状态: {self.auto_save_checkbox.isChecked()}")
+        auto_save = self.auto_save_checkbox.isChecked()
+        print(f"停止采集 - 自动保存开关状态: {auto_save}")
         
         # 更新状态栏
-        if self.main_window and hasattr(self.main_window, 'acquisition_status_label'):
-            self.main_window.acquisition_status_label.setText("数据采集: 停止")
+        if self._status_label is not None:
+            self._status_label.setText("数据采集: 停止")
         
         # 如果启用了自动保存，发出停止采集信号
-        if self.auto_save_checkbox.isChecked():
+        if not was_running:
+            return
+        if auto_save:
             print("发出停止采集信号，触发自动保存...")
             self.acquisition_stopped.emit()
         else:
             print("自动保存已关闭，不会自动保存数据")
         
-    def collect_data(self):
-        """采集数据（只采集选中设备的数据，支持滤波处理）"""
-        current_time = time.time()
-        selected_devices = self.get_selected_devices()
+    def shutdown_acquisition(self):
+        """停止采集线程（不触发自动保存）"""
+        self._plot_widget = None
+        if self._acq_worker is None:
+            return
+        
+        self.acquisition_devices_changed.disconnect(self._acq_worker.set_devices)
+        self.acquisition_filters_changed.disconnect(self._acq_worker.set_filters)
+        # 请求停止并退出事件循环；工作线程在当前采集返回后结束，结束时执行stop。
+        # 挂起的VISA读取留在读取线程池中自行结束，采集线程很快退出；
+        # 最多等待 ACQ_STOP_TIMEOUT_MS，超时则让线程在后台自行结束
+        self._acq_worker.request_stop()
+        self._acq_thread.quit()
+        if not self._acq_thread.wait(self.ACQ_STOP_TIMEOUT_MS):
+            log.warning("采集线程 %d ms 内未结束（设备读取未返回），在后台等待其结束",
+                        self.ACQ_STOP_TIMEOUT_MS)
+            self._detach_acquisition_thread(self._acq_thread)
+        
+        self._acq_worker = None
+        self._acq_thread = None
+        self.update_filter_performance_timer()
+        
+        self.sample_logger.stop()
+        
+    @staticmethod
+    def _detach_acquisition_thread(thread):
+        """
+        将未按时结束的采集线程与面板解除父子关系并保持引用，
+        避免面板销毁时销毁仍在运行的QThread，线程结束后释放引用
+        """
+        thread.setParent(None)
+        _detached_threads.add(thread)
+        thread.finished.connect(lambda: _detached_threads.discard(thread))
+        
+    def start_sample_logging(self):
+        """在数据保存目录下创建实时记录文件并启动记录线程"""
+        save_dir = os.path.join(os.getcwd(), "数据保存")
+        try:
+            os.makedirs(save_dir, exist_ok=True)
+        except OSError as e:
+            log.warning("创建数据保存目录失败: %s", e)
+            return
+        
+        filename = f"PM100D_实时记录_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+        self.sample_logger.start(os.path.join(save_dir, filename))
+        
+    def is_acquiring(self):
+        """是否正在采集数据"""
+        return self._acq_worker is not None
+        
+    def get_selected_device_handles(self):
+        """获取选中设备的 设备ID -> 设备对象 映射"""
+        return {
+            device_id: self.connected_devices[device_id]['device']
+            for device_id in self.get_selected_devices()
+            if device_id in self.connected_devices
+        }
+        
+    def sync_acquisition_devices(self):
+        """将当前选中的设备同步到采集线程"""
+        if self._acq_worker is not None:
+            self.acquisition_devices_changed.emit(self.get_selected_device_handles())
+        
+    def update_filter_performance_timer(self):
+        """采集中且滤波启用时运行性能刷新定时器，否则停止（停止前刷新一次最终结果）"""
+        running = self.is_acquiring() and self.filter_enabled
+        if running == self.filter_performance_timer.isActive():
+            return
+        if running:
+            self.filter_performance_timer.start()
+        else:
+            self.filter_performance_timer.stop()
+            self.update_filter_performance()
+        
+    def get_filter_config(self):
+        """获取交给采集线程的滤波配置快照，滤波未启用时返回None"""
+        if not self.filter_enabled or not self.noise_processors:
+            return None
+        return dict(self.noise_processors), dict(self.main_reference_mapping)
+        
+    def sync_acquisition_filters(self):
+        """将当前滤波配置同步到采集线程"""
+        if self._acq_worker is not None:
+            self.acquisition_filters_changed.emit(self.get_filter_config())
+        
+    @Slot(int, int)
+    def _on_poll_overrun(self, elapsed_ms, interval_ms):
+        """在状态栏提示采集超时（超时周期的采集已被跳过）"""
+        if self._status_bar is not None:
+            self._status_bar.showMessage(
+                f"采集超时: 耗时 {elapsed_ms} ms > 间隔 {interval_ms} ms，已跳过错过的采集周期", 3000
+            )
+        
+    @Slot(float, dict, dict)
+    def _apply_samples(self, current_time, raw_data, filter_results):
+        """处理采集线程发来的一轮数据和滤波结果（只处理选中设备）"""
+        if self._acq_worker is None:
+            # 采集已停止，丢弃仍在队列中的数据
+            return
+        
+        selected_devices = self._selected_cache
         
         if not selected_devices:
             print("没有选中设备，停止数据采集")
             self.stop_acquisition()
             return
             
-        print(f"开始数据采集 - 时间戳: {current_time}")
-        print(f"选中设备数量: {len(selected_devices)}")
-        
-        # 存储原始数据用于滤波处理
-        raw_data = {}
-        
-        # 第一步：采集所有选中设备的原始数据
-        for device_id in selected_devices:
-            if device_id not in self.connected_devices:
-                print(f"设备 {device_id} 已断开连接，跳过采集")
-                continue
+        log.debug("处理采集数据 - 时间戳: %s", current_time)
+        log.debug("选中设备数量: %d", len(selected_devices))
+        
+        # 更新界面显示和数据存储（滤波已在采集线程完成，本轮数据批量提交）
+        table_rows = []
+        log_rows = []
+        plot_samples = []
+        
+        if filter_results:
+            for device_id in selected_devices:
+                if device_id not in raw_data:
+                    continue
+                    
+                raw_power = raw_data[device_id]
+                result = filter_results.get(device_id)
+                if result is not None:
+                    filtered_power, noise_estimate, proc_info = result
+                else:
+                    filtered_power, noise_estimate, proc_info = raw_power, 0.0, None
                 
-            try:
-                print(f"正在采集设备 {device_id} 的数据...")
-                device_info = self.connected_devices[device_id]
-                power = device_info['device'].getPower()
-                raw_data[device_id] = power
-                print(f"设备 {device_id} 功率值: {power:.6e} W")
+                # 数据表格显示滤波后的值，实时记录保存原始值
+                table_rows.append((current_time, device_id, filtered_power))
+                log_rows.append((current_time, device_id, raw_power))
                 
-            except Exception as e:
-                print(f"采集设备 {device_id} 数据失败: {e}")
-                continue
-        
-        # 第二步：处理滤波（如果启用）
-        processed_data = {}
-        noise_estimates = {}
-        processing_info = {}
-        
-        if self.filter_enabled and self.noise_processors and raw_data:
-            print("执行噪声滤波处理...")
+                # 绘图数据包含原始和滤波数据
+                plot_samples.append((device_id, raw_power, filtered_power, noise_estimate, proc_info))
             
-            for device_id, raw_power in raw_data.items():
-                # 获取参考信号
-                ref_device_id = self.main_reference_mapping.get(device_id)
-                ref_power = raw_data.get(ref_device_id, raw_power) if ref_device_id else raw_power
-                
-                # 执行滤波处理
-                if device_id in self.noise_processors:
-                    try:
-                        processor = self.noise_processors[device_id]
-                        filtered_power, proc_info = processor.process_sample(raw_power, ref_power)
-                        
-                        processed_data[device_id] = filtered_power
-                        noise_estimates[device_id] = proc_info.get('noise_estimate', 0.0)
-                        processing_info[device_id] = proc_info
-                        
-                        print(f"设备 {device_id} 滤波处理: 原始={raw_power:.6e}W, 滤波后={filtered_power:.6e}W, "
-                              f"噪声估计={noise_estimates[device_id]:.6e}W")
-                        
-                    except Exception as e:
-                        print(f"设备 {device_id} 滤波处理失败: {e}")
-                        # 滤波失败时使用原始数据
-                        processed_data[device_id] = raw_power
-                        noise_estimates[device_id] = 0.0
-                        processing_info[device_id] = {}
-                else:
-                    # 没有对应处理器时使用原始数据
-                    processed_data[device_id] = raw_power
-                    noise_estimates[device_id] = 0.0
-                    processing_info[device_id] = {}
         else:
-            # 滤波未启用时直接使用原始数据
-            processed_data = raw_data.copy()
-            for device_id in raw_data:
-                noise_estimates[device_id] = 0.0
-                processing_info[device_id] = {}
-        
-        # 第三步：更新界面显示和数据存储
-        for device_id in selected_devices:
-            if device_id not in raw_data:
-                continue
+            # 本轮没有滤波结果（滤波未启用或没有处理器）：原始数据直接用于表格、记录和绘图
+            for device_id in selected_devices:
+                raw_power = raw_data.get(device_id)
+                if raw_power is None:
+                    continue
                 
-            raw_power = raw_data[device_id]
-            filtered_power = processed_data.get(device_id, raw_power)
-            noise_estimate = noise_estimates.get(device_id, 0.0)
-            proc_info = processing_info.get(device_id, {})
+                row = (current_time, device_id, raw_power)
+                table_rows.append(row)
+                log_rows.append(row)
+                plot_samples.append((device_id, raw_power, raw_power, 0.0, None))
+        
+        # 实时显示第一个选中设备的功率（每轮只更新一次）
+        first_device_id = selected_devices[0]
+        if first_device_id in raw_data:
+            if self.filter_enabled:
+                # 滤波启用时显示滤波后的值
+                result = filter_results.get(first_device_id)
+                filtered_power = result[0] if result is not None else raw_data[first_device_id]
+                self.set_power_text(_POWER_FMT_FILTERED(filtered_power))
+            else:
+                self.set_power_text(_POWER_FMT_W(raw_data[first_device_id]))
+        
+        # 整批更新表格和绘图，只触发一次重绘
+        self.data_table.setUpdatesEnabled(False)
+        try:
+            self.add_rows_to_table(table_rows)
+            self.sample_logger.log_many(log_rows)
             
-            try:
-                # 更新实时显示（显示第一个选中设备的功率）
-                if device_id == selected_devices[0]:
-                    if self.filter_enabled:
-                        # 滤波启用时显示滤波后的值
-                        self.power_label.setText(f"{filtered_power:.6e} W (滤波)")
-                    else:
-                        self.power_label.setText(f"{raw_power:.6e} W")
-                
-                # 添加到数据表格（显示滤波后的值）
-                display_power = filtered_power if self.filter_enabled else raw_power
-                self.add_data_to_table(current_time, device_id, display_power)
-                
-                # 发送数据到绘图组件（包含原始和滤波数据）
-                if self.plot_widget is not None:
-                    self.plot_widget.add_device_data(
-                        device_id=device_id,
-                        time_point=current_time,
-                        power_value=raw_power,
-                        filtered_value=filtered_power,
-                        noise_estimate=noise_estimate,
-                        processing_info=proc_info
-                    )
-                    
-                    print(f"向绘图组件发送数据: 设备={device_id}, 原始={raw_power:.6e}W, "
-                          f"滤波={filtered_power:.6e}W")
-                    
-                    # 验证数据是否成功添加
-                    if hasattr(self.plot_widget, 'power_data'):
-                        device_data_count = len(self.plot_widget.power_data.get(device_id, []))
-                        print(f"设备 {device_id} 当前数据点数: {device_data_count}")
-                else:
-                    print(f"错误: plot_widget 引用为空，无法保存数据到图形组件")
-                
-            except Exception as e:
-                print(f"更新设备 {device_id} 界面数据失败: {e}")
+            if self._plot_widget is not None:
+                self._plot_widget.add_device_batch(current_time, plot_samples)
+                log.debug("向绘图组件发送 %d 个设备的数据", len(plot_samples))
+            else:
+                log.warning("plot_widget 引用为空，无法保存数据到图形组件")
+        except Exception as e:
+            log.warning("批量更新界面数据失败: %s", e)
+        finally:
+            self.data_table.setUpdatesEnabled(True)
+        
+        if table_rows:
+            self.data_table.scrollToBottom()
         
         # 记录处理统计
         if self.filter_enabled:
             total_devices = len(raw_data)
-            filtered_devices = len(processed_data)
-            print(f"本轮处理统计: 总设备数={total_devices}, 滤波设备数={filtered_devices}")
+            filtered_devices = len(filter_results)
+            log.debug("本轮处理统计: 总设备数=%d, 滤波设备数=%d", total_devices, filtered_devices)
                 
+    def set_power_text(self, text, force=False):
+        """更新当前功率显示（文本未变化或标签不可见时跳过重绘，force为True时强制更新）"""
+        if not force and (text == self._last_power_text or not self.power_label.isVisible()):
+            return
+        self.power_label.setText(text)
+        self._last_power_text = text
+        
     def add_data_to_table(self, timestamp, device_id, power):
         """添加数据到表格"""
-        row = self.data_table.rowCount()
-        self.data_table.insertRow(row)
-        
-        time_str = time.strftime("%H:%M:%S", time.localtime(timestamp))
-        self.data_table.setItem(row, 0, QTableWidgetItem(time_str))
-        self.data_table.setItem(row, 1, QTableWidgetItem(device_id))
-        self.data_table.setItem(row, 2, QTableWidgetItem(f"{power:.6e}"))
+        # 模型内部限制为最新的100行
+        self.data_table.setUpdatesEnabled(False)
+        try:
+            self.data_model.append(timestamp, device_id, power)
+        finally:
+            self.data_table.setUpdatesEnabled(True)
         
-        # 限制表格行数，保持最新的100行
-        if self.data_table.rowCount() > 100:
-            self.data_table.removeRow(0)
-            
         # 滚动到底部
         self.data_table.scrollToBottom()
         
+    def add_rows_to_table(self, rows):
+        """批量添加数据到表格（不滚动，由调用方统一处理）"""
+        self.data_model.extend(rows)
+        
+    @Slot()
     def clear_data(self):
         """清除数据"""
         print("RightPanel: 清除数据按钮被点击")
-        table_rows = self.data_table.rowCount()
-        self.data_table.setRowCount(0)
-        self.power_label.setText("-- W")
+        table_rows = self.data_model.rowCount()
+        self.data_model.clear()
+        self.set_power_text("-- W", force=True)
         print(f"RightPanel: 清除了数据表格的 {table_rows} 行数据")
         
         # 同时清除绘图组件的数据
@@ -754,14 +1554,15 @@ class RightPanel(QWidget):
         else:
             print("RightPanel: 绘图组件引用为空，无法清除绘图组件数据")
     
+    @Slot(bool)
     def on_auto_save_toggled(self, checked):
         """自动保存选项切换时的响应"""
         status = "启用" if checked else "禁用"
         print(f"自动保存功能已{status}")
         
         # 如果主窗口存在，更新状态栏
-        if self.main_window and hasattr(self.main_window, 'status_bar'):
-            self.main_window.status_bar.showMessage(f"自动保存功能已{status}", 2000)
+        if self._status_bar is not None:
+            self._status_bar.showMessage(f"自动保存功能已{status}", 2000)
     
     def create_noise_filter_section(self, parent_layout):
         """创建噪声滤波控制区域"""
@@ -774,8 +1575,8 @@ class RightPanel(QWidget):
         self.filter_enable_checkbox.toggled.connect(self.on_filter_enable_toggled)
         filter_enable_layout.addWidget(self.filter_enable_checkbox)
         
-        self.filter_status_label = QLabel("状态: 未启用")
-        self.filter_status_label.setStyleSheet("color: #666; font-style: italic;")
+        self.filter_status_label = QLabel()
+        self._set_text_if_changed(self.filter_status_label, "状态: 未启用", _QSS_IDLE)
         filter_enable_layout.addWidget(self.filter_status_label)
         filter_enable_layout.addStretch()
         
@@ -786,14 +1587,18 @@ class RightPanel(QWidget):
         self.filter_tabs.setMinimumHeight(400)  # 设置最小高度确保内容显示完整
         filter_layout.addWidget(self.filter_tabs)
         
-        # 分光路设置选项卡
+        # 分光路设置选项卡（默认显示的页，直接创建）
         self.create_dual_path_tab()
         
-        # LMS滤波器选项卡
-        self.create_lms_filter_tab()
-        
-        # 性能监控选项卡
-        self.create_performance_monitor_tab()
+        # LMS滤波器和性能监控选项卡先放空白页，首次启用滤波时再创建内容
+        # （未启用时选项卡整体禁用，无法切换到这两页，相关控件也只在启用后才会被访问）
+        self._pending_filter_tabs = []
+        for title, builder in (("LMS参数", self.create_lms_filter_tab),
+                               ("性能监控", self.create_performance_monitor_tab)):
+            page = QWidget()
+            self.filter_tabs.addTab(page, title)
+            self._pending_filter_tabs.append((builder, page))
+        self.filter_tabs.currentChanged.connect(self._on_filter_tab_changed)
         
         # 初始状态禁用所有控件
         self.set_filter_controls_enabled(False)
@@ -819,7 +1624,12 @@ class RightPanel(QWidget):
             ]
             for name, mode in mode_items:
                 self.suppression_mode_combo.addItem(name, mode)
-        self.suppression_mode_combo.currentTextChanged.connect(self.on_suppression_mode_changed)
+        self._current_mode = self.suppression_mode_combo.currentData()
+        self.suppression_mode_combo.currentIndexChanged.connect(self._cache_suppression_mode)
+        # 切换模式会重建各处理器的LMS滤波器，排队执行，让下拉框先完成关闭和重绘
+        self.suppression_mode_combo.currentTextChanged.connect(
+            self.on_suppression_mode_changed, Qt.QueuedConnection
+        )
         mode_layout.addWidget(self.suppression_mode_combo)
         layout.addLayout(mode_layout)
         
@@ -867,23 +1677,33 @@ class RightPanel(QWidget):
         
         cal_layout.addLayout(cal_control_layout)
         
-        self.calibration_status_label = QLabel("标定状态: 未标定")
-        self.calibration_status_label.setStyleSheet("font-size: 10px; color: #666;")
+        self.calibration_status_label = QLabel()
+        self._set_text_if_changed(self.calibration_status_label, "标定状态: 未标定", _QSS_CAL_IDLE)
         cal_layout.addWidget(self.calibration_status_label)
         
         layout.addWidget(calibration_group)
         
         self.filter_tabs.addTab(dual_path_tab, "分光路设置")
     
-    def create_lms_filter_tab(self):
-        """创建LMS滤波器选项卡"""
-        lms_tab = QWidget()
+    def _ensure_filter_tabs_built(self):
+        """创建尚未创建内容的滤波器选项卡"""
+        pending, self._pending_filter_tabs = self._pending_filter_tabs, []
+        for builder, page in pending:
+            builder(page)
+    
+    def create_lms_filter_tab(self, lms_tab):
+        """创建LMS滤波器选项卡内容（lms_tab为已加入filter_tabs的页面）"""
         layout = QVBoxLayout(lms_tab)
         
         # LMS参数调整
         params_group = QGroupBox("LMS参数")
         params_layout = QVBoxLayout(params_group)
         
+        # 参数控件连续变化时（如拖动滑块）合并后再写入各处理器
+        self._lms_update_timer = self._create_debounce_timer(
+            self.update_lms_parameters, self.LMS_PARAM_DEBOUNCE_MS
+        )
+        
         # 滤波器长度
         length_layout = QHBoxLayout()
         length_layout.addWidget(QLabel("滤波器长度:"))
@@ -949,12 +1769,10 @@ class RightPanel(QWidget):
         control_layout.addWidget(self.lms_test_button)
         
         layout.addLayout(control_layout)
-        
-        self.filter_tabs.addTab(lms_tab, "LMS参数")
     
-    def create_performance_monitor_tab(self):
-        """创建性能监控选项卡"""
-        perf_tab = QWidget()
+    def create_performance_monitor_tab(self, perf_tab):
+        """创建性能监控选项卡内容（perf_tab为已加入filter_tabs的页面）"""
+        self._perf_tab = perf_tab
         layout = QVBoxLayout(perf_tab)
         
         # 性能指标显示
@@ -982,8 +1800,8 @@ class RightPanel(QWidget):
         # 收敛状态
         convergence_layout = QHBoxLayout()
         convergence_layout.addWidget(QLabel("收敛状态:"))
-        self.convergence_label = QLabel("未启动")
-        self.convergence_label.setStyleSheet("font-style: italic; color: #666;")
+        self.convergence_label = QLabel()
+        self._set_text_if_changed(self.convergence_label, "未启动", _QSS_IDLE)
         convergence_layout.addWidget(self.convergence_label)
         convergence_layout.addStretch()
         metrics_layout.addLayout(convergence_layout)
@@ -998,6 +1816,7 @@ class RightPanel(QWidget):
         self.processing_stats_text.setMaximumHeight(80)
         self.processing_stats_text.setMinimumHeight(60)
         self.processing_stats_text.setReadOnly(True)
+        self.processing_stats_text.setAcceptRichText(False)
         self.processing_stats_text.setStyleSheet("font-family: monospace; font-size: 9px;")
         stats_layout.addWidget(self.processing_stats_text)
         
@@ -1014,8 +1833,12 @@ class RightPanel(QWidget):
         export_layout.addWidget(self.export_performance_button)
         
         layout.addLayout(export_layout)
-        
-        self.filter_tabs.addTab(perf_tab, "性能监控")
+    
+    @Slot(int)
+    def _on_filter_tab_changed(self, index):
+        """切换到性能监控页时补上被跳过的刷新"""
+        if self._perf_dirty and self.filter_tabs.widget(index) is self._perf_tab:
+            self.update_filter_performance()
     
     def set_filter_controls_enabled(self, enabled):
         """设置滤波器控件的启用状态"""
@@ -1023,15 +1846,17 @@ class RightPanel(QWidget):
         
         # 更新状态标签
         if enabled:
-            self.filter_status_label.setText("状态: 已启用")
-            self.filter_status_label.setStyleSheet("color: #2E7D32; font-weight: bold;")
+            self._set_text_if_changed(self.filter_status_label, "状态: 已启用", _QSS_OK)
         else:
-            self.filter_status_label.setText("状态: 未启用")
-            self.filter_status_label.setStyleSheet("color: #666; font-style: italic;")
+            self._set_text_if_changed(self.filter_status_label, "状态: 未启用", _QSS_IDLE)
     
     # 滤波器事件处理方法
+    @Slot(bool)
     def on_filter_enable_toggled(self, checked):
         """滤波器启用状态切换"""
+        if checked:
+            self._ensure_filter_tabs_built()
+        
         self.filter_enabled = checked
         self.set_filter_controls_enabled(checked)
         
@@ -1045,46 +1870,60 @@ class RightPanel(QWidget):
             self.noise_processors.clear()
             self.main_reference_mapping.clear()
         
+        # 采集进行中时同步滤波配置
+        self.sync_acquisition_filters()
+        self.update_filter_performance_timer()
+        
         # 更新主窗口状态栏
-        if self.main_window and hasattr(self.main_window, 'status_bar'):
+        if self._status_bar is not None:
             status = "启用" if checked else "禁用"
-            self.main_window.status_bar.showMessage(f"噪声滤波系统已{status}", 3000)
+            self._status_bar.showMessage(f"噪声滤波系统已{status}", 3000)
+    
+    @Slot(int)
+    def _cache_suppression_mode(self, index):
+        """下拉框选中项变化时缓存对应的抑制模式"""
+        self._current_mode = self.suppression_mode_combo.itemData(index)
     
+    @Slot()
     def on_suppression_mode_changed(self):
         """抑制模式改变"""
         if not self.filter_enabled:
             return
         
         current_text = self.suppression_mode_combo.currentText()
-        current_mode = self.suppression_mode_combo.currentData()
+        current_mode = self._current_mode
         
         print(f"切换抑制模式: {current_text}")
         
         # 更新所有处理器的模式
         for processor in self.noise_processors.values():
-            if processor and hasattr(processor, 'update_mode'):
+            if processor:
                 processor.update_mode(current_mode)
     
+    @Slot(int)
     def on_step_size_changed(self, value):
         """学习率滑块改变"""
         step_size = value / 1000.0  # 0.001 to 0.1
         self.step_size_label.setText(f"{step_size:.3f}")
         
-        # 更新LMS滤波器参数
-        self.update_lms_parameters()
+        # 更新LMS滤波器参数（合并连续变化）
+        self._lms_update_timer.start()
     
+    @Slot(int)
     def on_leakage_changed(self, value):
         """泄漏因子滑块改变"""
         leakage = value / 1000.0  # 0.9 to 1.0
         self.leakage_label.setText(f"{leakage:.3f}")
         
-        # 更新LMS滤波器参数
-        self.update_lms_parameters()
+        # 更新LMS滤波器参数（合并连续变化）
+        self._lms_update_timer.start()
     
+    @Slot()
     def on_lms_params_changed(self):
         """LMS参数改变"""
-        self.update_lms_parameters()
+        self._lms_update_timer.start()
     
+    @Slot(bool)
     def on_auto_adjust_toggled(self, checked):
         """自动调整切换"""
         status = "启用" if checked else "禁用"
@@ -1099,8 +1938,9 @@ class RightPanel(QWidget):
         leakage = self.leakage_slider.value() / 1000.0
         
         for processor in self.noise_processors.values():
-            if processor and hasattr(processor, 'lms_filter') and processor.lms_filter:
-                processor.lms_filter.update_parameters(step_size, leakage)
+            lms_filter = processor.lms_filter if processor else None
+            if lms_filter is not None:
+                lms_filter.update_parameters(step_size, leakage)
     
     def setup_noise_processors(self):
         """设置噪声处理器"""
@@ -1114,7 +1954,7 @@ class RightPanel(QWidget):
             return
         
         # 获取当前抑制模式
-        current_mode = self.suppression_mode_combo.currentData()
+        current_mode = self._current_mode
         if not current_mode:
             current_mode = NoiseSuppressionMode.RATIO if NoiseSuppressionMode else None
         
@@ -1138,15 +1978,14 @@ class RightPanel(QWidget):
                     print(f"为设备 {device_id} 创建噪声处理器")
                     
                 except Exception as e:
-                    print(f"创建设备 {device_id} 的处理器失败: {e}")
+                    log.warning("创建设备 %s 的处理器失败: %s", device_id, e)
         
         # 自动配对设备
         self.auto_pair_devices()
     
+    @Slot()
     def add_device_pairing(self):
         """添加设备配对"""
-        from PySide6.QtWidgets import QDialog, QDialogButtonBox, QFormLayout
-        
         dialog = QDialog(self)
         dialog.setWindowTitle("添加设备配对")
         layout = QFormLayout(dialog)
@@ -1175,17 +2014,36 @@ class RightPanel(QWidget):
             if main_device != ref_device:
                 self.add_pairing_to_table(main_device, ref_device)
                 self.main_reference_mapping[main_device] = ref_device
+                self.sync_acquisition_filters()
                 print(f"添加配对: {main_device} -> {ref_device}")
     
     def add_pairing_to_table(self, main_device, ref_device, status="活动"):
         """添加配对到表格"""
-        row = self.device_pairing_table.rowCount()
-        self.device_pairing_table.insertRow(row)
+        self.add_pairings_bulk([(main_device, ref_device, status)])
+    
+    def add_pairings_bulk(self, pairs):
+        """
+        批量追加配对到表格末尾：一次设定行数后逐格填充，期间暂停重绘
+        
+        参数:
+            pairs (list): (主信号设备, 参考信号设备, 状态) 元组列表
+        """
+        if not pairs:
+            return
         
-        self.device_pairing_table.setItem(row, 0, QTableWidgetItem(main_device))
-        self.device_pairing_table.setItem(row, 1, QTableWidgetItem(ref_device))
-        self.device_pairing_table.setItem(row, 2, QTableWidgetItem(status))
+        table = self.device_pairing_table
+        start = table.rowCount()
+        table.setUpdatesEnabled(False)
+        try:
+            table.setRowCount(start + len(pairs))
+            for row, (main_device, ref_device, status) in enumerate(pairs, start):
+                table.setItem(row, 0, QTableWidgetItem(main_device))
+                table.setItem(row, 1, QTableWidgetItem(ref_device))
+                table.setItem(row, 2, QTableWidgetItem(status))
+        finally:
+            table.setUpdatesEnabled(True)
     
+    @Slot()
     def remove_device_pairing(self):
         """删除设备配对"""
         current_row = self.device_pairing_table.currentRow()
@@ -1199,32 +2057,52 @@ class RightPanel(QWidget):
             
             # 从表格中删除
             self.device_pairing_table.removeRow(current_row)
+            self.sync_acquisition_filters()
             print(f"删除配对: {main_device}")
     
+    @Slot()
     def auto_pair_devices(self):
         """自动配对设备"""
         selected_devices = self.get_selected_devices()
         
-        # 清空现有配对
-        self.device_pairing_table.setRowCount(0)
+        # 简单策略：相邻两个设备一组，前一个作为主信号，后一个作为参考
+        new_pairs = list(zip(selected_devices[::2], selected_devices[1::2]))
+        
         self.main_reference_mapping.clear()
+        self.main_reference_mapping.update(new_pairs)
         
-        if len(selected_devices) >= 2:
-            # 简单策略：第一个设备作为主信号，第二个作为参考
-            for i in range(0, len(selected_devices), 2):
-                if i + 1 < len(selected_devices):
-                    main_device = selected_devices[i]
-                    ref_device = selected_devices[i + 1]
-                    
-                    self.add_pairing_to_table(main_device, ref_device)
-                    self.main_reference_mapping[main_device] = ref_device
+        # 只改动与新配对不同的行，更新期间暂停表格重绘
+        table = self.device_pairing_table
+        table.setUpdatesEnabled(False)
+        try:
+            # 多余的行一次性截掉
+            if table.rowCount() > len(new_pairs):
+                table.setRowCount(len(new_pairs))
             
+            existing_rows = table.rowCount()
+            for row, (main_device, ref_device) in enumerate(new_pairs[:existing_rows]):
+                for column, text in enumerate((main_device, ref_device, "活动")):
+                    item = table.item(row, column)
+                    if item is None:
+                        table.setItem(row, column, QTableWidgetItem(text))
+                    elif item.text() != text:
+                        item.setText(text)
+        finally:
+            table.setUpdatesEnabled(True)
+        
+        # 新增的配对一次性追加
+        self.add_pairings_bulk([(main_device, ref_device, "活动")
+                                for main_device, ref_device in new_pairs[existing_rows:]])
+        
+        if new_pairs:
             print(f"自动配对完成: {len(self.main_reference_mapping)} 对设备")
+        
+        self.sync_acquisition_filters()
     
+    @Slot()
     def start_calibration(self):
         """开始系统标定"""
         if not self.noise_processors:
-            from PySide6.QtWidgets import QMessageBox
             QMessageBox.warning(self, "标定失败", "请先启用噪声滤波系统")
             return
         
@@ -1232,74 +2110,76 @@ class RightPanel(QWidget):
         self.calibration_progress.setVisible(True)
         self.calibration_progress.setRange(0, 100)
         
-        # 模拟标定过程
-        self.calibration_timer = QTimer()
+        # 模拟标定过程（总时长5秒，每100ms推进2%）
         self.calibration_progress_value = 0
-        
-        def update_calibration():
-            self.calibration_progress_value += 10
-            self.calibration_progress.setValue(self.calibration_progress_value)
-            
-            if self.calibration_progress_value >= 100:
-                self.calibration_timer.stop()
-                self.calibration_button.setEnabled(True)
-                self.calibration_progress.setVisible(False)
-                self.calibration_status_label.setText("标定状态: 标定完成")
-                self.calibration_status_label.setStyleSheet("font-size: 10px; color: #2E7D32; font-weight: bold;")
-                print("系统标定完成")
-        
-        self.calibration_timer.timeout.connect(update_calibration)
-        self.calibration_timer.start(500)  # 每500ms更新一次
+        self.calibration_progress.setValue(0)
+        self.calibration_timer.start()
         
         print("开始系统标定...")
     
+    @Slot()
+    def _on_calibration_tick(self):
+        """标定进度定时器回调"""
+        self.calibration_progress_value += 2
+        self.calibration_progress.setValue(self.calibration_progress_value)
+        
+        if self.calibration_progress_value >= 100:
+            self.calibration_timer.stop()
+            self.calibration_button.setEnabled(True)
+            self.calibration_progress.setVisible(False)
+            self._set_text_if_changed(self.calibration_status_label, "标定状态: 标定完成", _QSS_CAL_DONE)
+            print("系统标定完成")
+    
+    @Slot()
     def reset_lms_filters(self):
         """重置LMS滤波器"""
         for processor in self.noise_processors.values():
-            if processor and hasattr(processor, 'lms_filter') and processor.lms_filter:
-                processor.lms_filter.reset()
+            lms_filter = processor.lms_filter if processor else None
+            if lms_filter is not None:
+                lms_filter.reset()
+        # LMS重置不经过处理器，不会更新版本号，清除缓存以重新读取收敛状态
+        self._perf_cache.clear()
         
         print("LMS滤波器已重置")
     
+    @Slot()
     def test_lms_filters(self):
         """测试LMS滤波器"""
         if not self.noise_processors:
-            from PySide6.QtWidgets import QMessageBox
             QMessageBox.information(self, "测试滤波器", "没有可测试的滤波器")
             return
         
-        # 生成测试信号并显示结果
-        import numpy as np
-        
-        test_results = []
-        for device_id, processor in self.noise_processors.items():
-            if processor:
-                # 生成测试信号
-                test_main = np.random.randn(100) * 0.1 + 1.0  # 主信号
-                test_ref = np.random.randn(100) * 0.05  # 参考信号（噪声）
-                
-                # 测试滤波
-                filtered_results = []
-                for main, ref in zip(test_main, test_ref):
-                    filtered, _ = processor.process_sample(main, ref)
-                    filtered_results.append(filtered)
-                
-                # 计算改善
-                original_std = np.std(test_main)
-                filtered_std = np.std(filtered_results)
-                improvement = 20 * np.log10(original_std / filtered_std) if filtered_std > 0 else 0
-                
-                test_results.append(f"{device_id}: {improvement:.1f}dB")
-        
-        from PySide6.QtWidgets import QMessageBox
+        # 在后台线程中测试，完成后回到界面线程显示结果
+        processors = {device_id: processor for device_id, processor in self.noise_processors.items()
+                      if processor}
+        if self._lms_test_thread is None:
+            self._lms_test_thread = LmsTestThread(self)
+            self._lms_test_thread.results_ready.connect(self._show_lms_test_results)
+            # 测试出错时不会发出结果信号，按钮在线程结束时恢复
+            self._lms_test_thread.finished.connect(partial(self.lms_test_button.setEnabled, True))
+        
+        self.lms_test_button.setEnabled(False)
+        self._lms_test_thread.processors = processors
+        self._lms_test_thread.start()
+    
+    @Slot(list)
+    def _show_lms_test_results(self, test_results):
+        """显示滤波器测试结果"""
         result_text = "滤波器测试结果:\n" + "\n".join(test_results)
         QMessageBox.information(self, "滤波器测试", result_text)
     
+    @Slot()
     def update_filter_performance(self):
         """更新滤波性能显示"""
         if not self.filter_enabled or not self.noise_processors:
             return
         
+        # 性能监控页不可见时不刷新，切换到该页时再补一次
+        if self.filter_tabs.currentWidget() is not self._perf_tab:
+            self._perf_dirty = True
+            return
+        self._perf_dirty = False
+        
         try:
             # 收集所有处理器的性能数据
             total_snr = 0.0
@@ -1308,58 +2188,66 @@ class RightPanel(QWidget):
             total_processors = 0
             
             stats_lines = []
+            cache = {}
             
             for device_id, processor in self.noise_processors.items():
                 if processor:
-                    summary = processor.get_performance_summary()
-                    
-                    snr = summary.get('snr_improvement', 0.0)
-                    noise_reduction = summary.get('noise_reduction_ratio', 0.0)
+                    # 指标版本号未变时复用上次的结果，不再重新生成性能总结
+                    version = processor.metrics_version
+                    cached = self._perf_cache.get(device_id)
+                    if cached is not None and cached[0] is processor and cached[1] == version:
+                        _, _, snr, noise_reduction, converged, line = cached
+                    else:
+                        # get_performance_summary总会包含这些键，直接取值
+                        summary = processor.get_performance_summary()
+                        snr = summary['snr_improvement']
+                        noise_reduction = summary['noise_reduction_ratio']
+                        
+                        # 检查LMS收敛状态
+                        lms_metrics = summary.get('lms_metrics')
+                        converged = lms_metrics is not None and lms_metrics['is_converged']
+                        
+                        line = _PERF_LINE_FMT % (device_id, snr, noise_reduction * 100, summary['sample_count'])
+                    cache[device_id] = (processor, version, snr, noise_reduction, converged, line)
                     
                     total_snr += snr
                     total_noise_reduction += noise_reduction
                     total_processors += 1
-                    
-                    # 检查LMS收敛状态
-                    if 'lms_metrics' in summary and summary['lms_metrics'].get('is_converged', False):
+                    if converged:
                         converged_count += 1
                     
                     # 添加统计信息
-                    stats_lines.append(
-                        f"{device_id}: SNR+{snr:.1f}dB, "
-                        f"降噪{noise_reduction*100:.1f}%, "
-                        f"样本{summary.get('sample_count', 0)}"
-                    )
+                    stats_lines.append(line)
+            
+            self._perf_cache = cache
             
             if total_processors > 0:
                 # 更新平均指标
                 avg_snr = total_snr / total_processors
                 avg_noise_reduction = total_noise_reduction / total_processors
                 
-                self.snr_value_label.setText(f"{avg_snr:.1f} dB")
-                self.noise_reduction_label.setText(f"{avg_noise_reduction*100:.1f}%")
+                self._set_text_if_changed(self.snr_value_label, f"{avg_snr:.1f} dB")
+                self._set_text_if_changed(self.noise_reduction_label, f"{avg_noise_reduction*100:.1f}%")
                 
                 # 更新收敛状态
                 if converged_count == total_processors:
-                    self.convergence_label.setText("已收敛")
-                    self.convergence_label.setStyleSheet("color: #2E7D32; font-weight: bold;")
+                    self._set_text_if_changed(self.convergence_label, "已收敛", _QSS_OK)
                 elif converged_count > 0:
-                    self.convergence_label.setText(f"部分收敛 ({converged_count}/{total_processors})")
-                    self.convergence_label.setStyleSheet("color: #FF9800; font-weight: bold;")
+                    self._set_text_if_changed(self.convergence_label,
+                                              f"部分收敛 ({converged_count}/{total_processors})",
+                                              _QSS_WARN)
                 else:
-                    self.convergence_label.setText("收敛中")
-                    self.convergence_label.setStyleSheet("color: #2196F3; font-style: italic;")
+                    self._set_text_if_changed(self.convergence_label, "收敛中", _QSS_INFO)
                 
-                # 更新统计文本
-                self.processing_stats_text.setText("\n".join(stats_lines))
+                # 更新统计文本（QTextEdit重设文本会重建整个文档）
+                self._set_text_if_changed(self.processing_stats_text, "\n".join(stats_lines))
             
         except Exception as e:
-            print(f"更新滤波性能失败: {e}")
+            log.warning("更新滤波性能失败: %s", e)
     
+    @Slot()
     def export_filter_data(self):
         """导出滤波数据"""
-        from PySide6.QtWidgets import QFileDialog
-        
         file_path, _ = QFileDialog.getSaveFileName(
             self, "导出滤波数据", "PM100D_滤波数据.csv",
             "CSV files (*.csv);;All files (*.*)"
@@ -1368,51 +2256,59 @@ class RightPanel(QWidget):
         if file_path and self.plot_widget:
             success = self.plot_widget.export_data(file_path)
             if success:
-                from PySide6.QtWidgets import QMessageBox
                 QMessageBox.information(self, "导出成功", f"滤波数据已导出到:\n{file_path}")
     
+    @Slot()
     def export_performance_report(self):
         """导出性能报告"""
-        from PySide6.QtWidgets import QFileDialog
-        
         file_path, _ = QFileDialog.getSaveFileName(
             self, "导出性能报告", "PM100D_滤波性能报告.txt",
             "Text files (*.txt);;All files (*.*)"
         )
         
-        if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("PM100D 噪声滤波性能报告\n")
-                    f.write("=" * 50 + "\n\n")
-                    
-                    # 系统配置信息
-                    f.write("系统配置:\n")
-                    f.write(f"  滤波模式: {self.suppression_mode_combo.currentText()}\n")
-                    f.write(f"  LMS学习率: {self.step_size_label.text()}\n")
-                    f.write(f"  泄漏因子: {self.leakage_label.text()}\n")
-                    f.write(f"  滤波器长度: {self.filter_length_spinbox.value()}\n\n")
-                    
-                    # 设备配对信息
-                    f.write("设备配对:\n")
-                    for main_dev, ref_dev in self.main_reference_mapping.items():
-                        f.write(f"  {main_dev} -> {ref_dev}\n")
-                    f.write("\n")
-                    
-                    # 性能指标
-                    f.write("性能指标:\n")
-                    f.write(f"  平均SNR改善: {self.snr_value_label.text()}\n")
-                    f.write(f"  平均噪声抑制率: {self.noise_reduction_label.text()}\n")
-                    f.write(f"  收敛状态: {self.convergence_label.text()}\n\n")
-                    
-                    # 详细统计
-                    f.write("详细统计:\n")
-                    f.write(self.processing_stats_text.toPlainText())
-                
-                from PySide6.QtWidgets import QMessageBox
-                QMessageBox.information(self, "导出成功", f"性能报告已导出到:\n{file_path}")
-                
-            except Exception as e:
-                from PySide6.QtWidgets import QMessageBox
-                QMessageBox.critical(self, "导出失败", f"导出性能报告失败:\n{str(e)}")
+        if not file_path:
+            return
+        
+        # 报告内容读取界面控件，需在界面线程生成
+        lines = [
+            "PM100D 噪声滤波性能报告",
+            "=" * 50,
+            "",
+            # 系统配置信息
+            "系统配置:",
+            f"  滤波模式: {self.suppression_mode_combo.currentText()}",
+            f"  LMS学习率: {self.step_size_label.text()}",
+            f"  泄漏因子: {self.leakage_label.text()}",
+            f"  滤波器长度: {self.filter_length_spinbox.value()}",
+            "",
+            # 设备配对信息
+            "设备配对:",
+        ]
+        lines.extend(f"  {main_dev} -> {ref_dev}" for main_dev, ref_dev in self.main_reference_mapping.items())
+        lines += [
+            "",
+            # 性能指标
+            "性能指标:",
+            f"  平均SNR改善: {self.snr_value_label.text()}",
+            f"  平均噪声抑制率: {self.noise_reduction_label.text()}",
+            f"  收敛状态: {self.convergence_label.text()}",
+            "",
+            # 详细统计
+            "详细统计:",
+        ]
+        text = "\n".join(lines) + "\n" + self.processing_stats_text.toPlainText()
+        
+        # 文件写入放到后台线程，完成后回到界面线程提示结果
+        thread = TextExportThread(file_path, text, self)
+        thread.export_finished.connect(self._on_report_exported)
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+    
+    @Slot(str, str)
+    def _on_report_exported(self, file_path, error):
+        """性能报告写入完成"""
+        if error:
+            QMessageBox.critical(self, "导出失败", f"导出性能报告失败:\n{error}")
+        else:
+            QMessageBox.information(self, "导出成功", f"性能报告已导出到:\n{file_path}")
 
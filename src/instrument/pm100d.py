@@ -1,8 +1,115 @@
+import asyncio
+import functools
+import logging
+import threading
 import pyvisa
 import time
 import numpy as np
 
-rm = pyvisa.ResourceManager()
+from instrument.usbtmc import UsbtmcResource, is_usbtmc_path
+
+log = logging.getLogger(__name__)
+
+
+def _open_resource_manager():
+    """
+    创建 VISA 资源管理器：优先使用系统安装的 VISA 库（如 NI-VISA，USB 传输在 C 库中完成，
+    大数据量时远快于纯 Python 实现），未安装时退回 pyvisa-py 后端。
+    """
+    try:
+        return pyvisa.ResourceManager()
+    except (OSError, ValueError) as e:
+        log.warning("未找到系统 VISA 库，改用 pyvisa-py 后端: %s", e)
+        return pyvisa.ResourceManager('@py')
+
+
+rm = _open_resource_manager()
+
+
+def _serialized(method):
+    """方法执行期间持有仪器的 I/O 锁，保证同一 VISA 会话上的命令和响应不被其他线程穿插。"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._io_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class VisaPool:
+    """
+    VISA 会话池：按资源地址缓存已打开的会话，重复连接同一设备时直接复用，
+    省去 open_resource 的开销（通常 0.2~2 秒）。
+
+    方法 (Methods):
+    .acquire(addr):     取出该地址的空闲会话，没有时新建。
+    .release(inst):     归还会话供下次复用，并关闭空闲超过 IDLE_TTL 秒的会话。
+    .close_all():       关闭池中所有空闲会话（程序退出时调用）。
+    """
+    IDLE_TTL = 300.0  # 空闲会话的最长保留时间（秒），None 表示不过期
+
+    _lock = threading.Lock()
+    _idle = {}  # 资源地址 -> [(会话, 归还时间), ...]
+
+    @classmethod
+    def acquire(cls, addr):
+        """取出 addr 的空闲会话，没有时新建一个。"""
+        with cls._lock:
+            expired = cls._evict_expired()
+            sessions = cls._idle.get(addr)
+            inst = sessions.pop()[0] if sessions else None
+        cls._close_sessions(expired)
+        if inst is None:
+            # /dev/usbtmcN 地址直接通过内核驱动访问，其余地址经 VISA 打开
+            inst = UsbtmcResource(addr) if is_usbtmc_path(addr) else rm.open_resource(addr)
+        return inst
+
+    @classmethod
+    def release(cls, inst):
+        """归还会话。归还前清空设备输出缓冲，避免残留响应影响下一个使用者。"""
+        try:
+            inst.clear()
+        except Exception:
+            # 会话已失效，直接关闭而不放回池中
+            cls._close_sessions([inst])
+            return
+        with cls._lock:
+            sessions = cls._idle.setdefault(inst.resource_name, [])
+            if all(s is not inst for s, _ in sessions):
+                sessions.append((inst, time.monotonic()))
+            expired = cls._evict_expired()
+        cls._close_sessions(expired)
+
+    @classmethod
+    def close_all(cls):
+        """关闭池中所有空闲会话。"""
+        with cls._lock:
+            sessions = [inst for entries in cls._idle.values() for inst, _ in entries]
+            cls._idle.clear()
+        cls._close_sessions(sessions)
+
+    @classmethod
+    def _evict_expired(cls):
+        """从池中移除空闲超时的会话并返回它们（调用方须持有锁，在锁外关闭）。"""
+        if cls.IDLE_TTL is None:
+            return []
+        deadline = time.monotonic() - cls.IDLE_TTL
+        expired = []
+        for addr in list(cls._idle):
+            entries = cls._idle[addr]
+            expired.extend(inst for inst, released in entries if released < deadline)
+            entries[:] = [(inst, released) for inst, released in entries if released >= deadline]
+            if not entries:
+                del cls._idle[addr]
+        return expired
+
+    @staticmethod
+    def _close_sessions(sessions):
+        """关闭会话，忽略已断开设备的关闭错误。"""
+        for inst in sessions:
+            try:
+                inst.close()
+            except Exception:
+                pass
 
 class PM100D:
     """
@@ -11,6 +118,11 @@ class PM100D:
     初始化变量 (Initialization Variables):
     resourceLoc:      包含 VISA 资源地址的字符串。通常可以自动找到，
                       但也可以手动指定，例如 'USB0::0x1313::0x8070::P0000116::INSTR'。
+                      在 Linux 上也可以是内核 usbtmc 驱动的设备文件，例如 '/dev/usbtmc0'，
+                      此时绕过 VISA 直接读写设备文件。
+    chunk_size:       单次 USB 批量读取的最大字节数，默认 1 MB。pyVISA 默认 20480 字节，
+                      较长的响应会被拆成多次读取。注意 pyvisa-py 后端对 chunk_size 的处理
+                      存在问题，大数据量传输时推荐使用 NI-VISA 后端。
 
     实例变量 (Variables):
     .inst:            一个包含 pyVISA 连接到 PM100D 硬件的容器。
@@ -20,80 +132,155 @@ class PM100D:
     .avg_count:       一个整数，表示当前的平均采样次数。
 
     方法 (Methods):
-    .setWavelength(nm):         设置波长校正值，单位 nm。
+    .setWavelength(nm):         设置波长校正值，单位 nm。与缓存值相同时不发送命令。
     .getWavelength():           返回当前的波长校正值 (nm)。
     .setBandwidth(name):        设置光电二极管带宽，name 必须是 'HI' 或 'LO'。
     .getBandwidth():            返回当前的带宽设置 ('HI' 或 'LO')。
     .setAvgCount(count):        设置平均采样次数。
+    .sync():                    将缓存的波长、带宽和平均次数强制重新写入设备。
     .getAvgCount():            返回当前的平均采样次数。
     .setRangeAuto(auto_on):     设置功率测量的自动量程。auto_on 为 True 或 False。
     .getRangeAuto():            返回自动量程是否开启。
+    .configurePower():          将测量配置为功率测量（getPower 首次调用时自动执行）。
     .getPower():                返回一个浮点数，表示当前的功率测量值，单位为瓦特 (W)。
-    .getSensorInfo():           返回一个字典，包含当前连接的传感器的信息。
+    .getPowerBatch(n):          连续测量 n 次功率，一次查询返回 numpy 数组 (W)。
+    .getSensorInfo(refresh):    返回一个字典，包含当前连接的传感器的信息（首次查询后缓存，
+                                更换传感器后用 refresh=True 重新查询）。
     .zero():                    执行清零（背景校准）操作。
     .write(message, q):         pyVISA inst.query() 或 inst.write() 的封装。
-    .close():                  关闭与 PM100D 的 pyVISA 连接。
+    .aquery(msg) / .awrite(msg):        query/write 的协程版本，在线程中执行，不阻塞事件循环。
+    .agetPower() / .agetPowerBatch(n):  getPower/getPowerBatch 的协程版本。
+    .asetWavelength(nm) / .asetBandwidth(name) / .asetAvgCount(count):  set* 的协程版本。
+                                所有 I/O 方法按仪器加锁串行访问 VISA 会话，不同仪器之间可以并发，
+                                例如 await asyncio.gather(pm1.agetPower(), pm2.agetPower())。
+    .close():                  释放与 PM100D 的 pyVISA 连接（会话归还 VisaPool 供复用）。
     """
     type = "PM100D"
 
-    def __init__(self, resourceLoc=None):
+    DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+    # 带宽设置的编码/解码表（名称 <-> 带宽状态查询返回值）
+    _BW_ENCODE = {"HI": "1", "LO": "0"}
+    _BW_DECODE = {"1": "HI", "0": "LO"}
+
+    def __init__(self, resourceLoc=None, chunk_size=DEFAULT_CHUNK_SIZE):
         """
         初始化并连接到 PM100D。
         """
+        self._closed = False
+        
+        # I/O 锁（可重入）：同步方法和协程版本都持有该锁，保证同一仪器的 VISA 会话串行访问
+        self._io_lock = threading.RLock()
+        
+        self.inst = None
         try:
-            self.inst = rm.open_resource(resourceLoc)
+            self.inst = VisaPool.acquire(resourceLoc)
             self.inst.timeout = 3000  # 增加超时为 3000 ms
+            # 增大单次读取块，长响应（如批量测量）只需少量 USB 批量读取
+            self.inst.chunk_size = chunk_size
+            self.inst.read_termination = '\n'
+            self.inst.write_termination = '\n'
             idn_response = self.inst.query("*IDN?").strip()
-            print("已连接到: ", idn_response)
+            log.info("已连接到: %s", idn_response)
         except Exception as e:
-            print(f"连接到 PM100D 时出错: {e}")
-            print("请检查连接和 VISA 驱动程序，然后重试。")
+            log.error("连接到 PM100D 时出错: %s。请检查连接和 VISA 驱动程序，然后重试。", e)
+            if self.inst is not None:
+                # 连接失败的会话可能已失效，直接关闭而不放回池中
+                try:
+                    self.inst.close()
+                except Exception:
+                    pass
+                self.inst = None
+            self._closed = True
             raise e
 
         # 带宽设置映射
-        self.bw = {"HI": "1", "LO": "0"}
+        self.bw = dict(self._BW_ENCODE)
+        
+        # 是否已配置为功率测量（配置后用 READ? 测量，不再每次重新配置）
+        self._power_configured = False
+        
+        # 缓存值与设备状态可能不一致的设置项，set* 对这些项不做相同值跳过
+        self._dirty = set()
         
-        # 初始化实例变量以匹配设备当前状态（添加错误处理）
+        # 传感器信息缓存（getSensorInfo 首次调用时查询）
+        self._sensor_info = None
+        
+        # 初始化实例变量以匹配设备当前状态：一次复合查询读取三项设置，失败时逐项查询
+        try:
+            wavelength, bw_state, avg_count = self.inst.query(
+                "SENS:CORR:WAV?;:INP:PDIO:FILT:LPAS:STAT?;:SENS:AVER:COUN?"
+            ).strip().split(';')
+            self.wavelength = float(wavelength)
+            self.bandwidth = self._BW_DECODE.get(bw_state.strip(), "LO")
+            self.avg_count = int(float(avg_count))
+            log.info("当前波长: %s nm, 带宽: %s, 平均次数: %d", self.wavelength, self.bandwidth, self.avg_count)
+        except Exception as e:
+            log.warning("批量读取设备设置失败，改为逐项读取: %s", e)
+            try:
+                # 清除可能残留的部分响应，避免影响后续查询
+                self.inst.clear()
+            except Exception:
+                pass
+            self._read_settings()
+
+    def _read_settings(self):
+        """逐项读取波长、带宽和平均次数，读取失败的项使用默认值。"""
         try:
             self.wavelength = self.getWavelength()
-            print(f"当前波长: {self.wavelength} nm")
+            log.info("当前波长: %s nm", self.wavelength)
         except Exception as e:
-            print(f"警告: 获取波长失败: {e}")
+            log.warning("获取波长失败: %s", e)
             self.wavelength = 1550  # 默认值
+            self._dirty.add('wavelength')
             
         try:
             self.bandwidth = self.getBandwidth()
-            print(f"当前带宽: {self.bandwidth}")
+            log.info("当前带宽: %s", self.bandwidth)
         except Exception as e:
-            print(f"警告: 获取带宽失败: {e}")
+            log.warning("获取带宽失败: %s", e)
             self.bandwidth = "LO"  # 默认值
+            self._dirty.add('bandwidth')
             
         try:
             self.avg_count = self.getAvgCount()
-            print(f"当前平均次数: {self.avg_count}")
+            log.info("当前平均次数: %d", self.avg_count)
         except Exception as e:
-            print(f"警告: 获取平均次数失败: {e}")
+            log.warning("获取平均次数失败: %s", e)
             self.avg_count = 10  # 默认值
+            self._dirty.add('avg_count')
 
+    @_serialized
     def setWavelength(self, nm=1550):
-        """设置波长校正值，单位为纳米 (nm)。"""
-        self.inst.write(f"SENS:CORR:WAV {int(nm)}")
-        self.wavelength = int(nm)
+        """设置波长校正值，单位为纳米 (nm)。与缓存值相同时不发送命令。"""
+        nm = int(nm)
+        if nm == self.wavelength and 'wavelength' not in self._dirty:
+            return
+        self.inst.write(f"SENS:CORR:WAV {nm}")
+        self.wavelength = nm
+        self._dirty.discard('wavelength')
 
+    @_serialized
     def getWavelength(self):
         """返回当前的波长校正值 (nm)。"""
         return float(self.inst.query("SENS:CORR:WAV?"))
 
+    @_serialized
     def setBandwidth(self, name="LO"):
         """
         设置光电二极管传感器的测量带宽。
         name: 'HI' (高带宽) 或 'LO' (低带宽, 噪声更小)。
         """
-        if name.upper() not in self.bw:
+        name = name.upper()
+        if name not in self.bw:
             raise ValueError("带宽名称必须是 'HI' 或 'LO'。")
-        self.inst.write(f"INP:PDIO:FILT:LPAS:STAT {self.bw[name.upper()]}")
-        self.bandwidth = name.upper()
+        if name == self.bandwidth and 'bandwidth' not in self._dirty:
+            return
+        self.inst.write(f"INP:PDIO:FILT:LPAS:STAT {self.bw[name]}")
+        self.bandwidth = name
+        self._dirty.discard('bandwidth')
 
+    @_serialized
     def getBandwidth(self):
         """返回当前的带宽设置 ('HI' 或 'LO')。"""
         try:
@@ -102,50 +289,105 @@ class PM100D:
             self.inst.timeout = 1000  # 短超时用于快速检测
             state = self.inst.query("INP:PDIO:FILT:LPAS:STAT?").strip()
             self.inst.timeout = original_timeout
-            return "HI" if state == "1" else "LO"
+            return self._BW_DECODE.get(state, "LO")
         except Exception:
             # 如果命令不支持或超时，返回默认值
             return "LO"
 
+    @_serialized
     def setAvgCount(self, count=10):
-        """设置平均采样次数。"""
-        self.inst.write(f"SENS:AVER:COUN {int(count)}")
-        self.avg_count = int(count)
+        """设置平均采样次数。与缓存值相同时不发送命令。"""
+        count = int(count)
+        if count == self.avg_count and 'avg_count' not in self._dirty:
+            return
+        self.inst.write(f"SENS:AVER:COUN {count}")
+        self.avg_count = count
+        self._dirty.discard('avg_count')
 
+    @_serialized
     def getAvgCount(self):
         """返回当前的平均采样次数。"""
         return int(self.inst.query("SENS:AVER:COUN?"))
 
+    @_serialized
+    def sync(self):
+        """将缓存的波长、带宽和平均次数强制重新写入设备（如设备被前面板或其他程序修改后）。"""
+        self._dirty.update(('wavelength', 'bandwidth', 'avg_count'))
+        self.setWavelength(self.wavelength)
+        self.setBandwidth(self.bandwidth)
+        self.setAvgCount(self.avg_count)
+
+    @_serialized
     def setRangeAuto(self, auto_on=True):
         """设置功率测量是否为自动量程。"""
         state = "ON" if auto_on else "OFF"
         self.inst.write(f"POW:RANG:AUTO {state}")
 
+    @_serialized
     def getRangeAuto(self):
         """返回自动量程是否开启 (True/False)。"""
         state = self.inst.query("POW:RANG:AUTO?").strip()
         return state == "1"
 
+    @_serialized
+    def configurePower(self):
+        """将测量配置为功率测量。配置保持有效，之后的 READ? 无需重新配置。"""
+        self.inst.write("CONF:POW")
+        self._power_configured = True
+
+    @_serialized
     def getPower(self):
-        """获取一次功率测量值，单位为瓦特 (W)。"""
-        return float(self.inst.query("MEAS:POW?"))
+        """
+        获取一次功率测量值，单位为瓦特 (W)。
+        MEAS:POW? 等价于每次 CONF:POW + READ?；这里只在首次配置，之后每次只发 READ?。
+        """
+        if not self._power_configured:
+            self.configurePower()
+        return float(self.inst.query("READ?"))
+
+    @_serialized
+    def getPowerBatch(self, n):
+        """
+        连续测量 n 次功率，单位为瓦特 (W)。
+        n 个 READ? 合并为一条复合查询，仪器依次测量，结果在一次响应中以分号分隔返回。
+        每次测量仍使用当前的平均次数设置。
+        """
+        if n <= 0:
+            return np.empty(0)
+        if not self._power_configured:
+            self.configurePower()
+        response = self.inst.query(";:".join(["READ?"] * n))
+        # PM100D 没有 FORMat 子系统和二进制块传输，只能返回 ASCII；
+        # 格式错误的字段引发 ValueError，返回值个数不符时同样报错
+        values = np.array(response.split(';'), dtype=np.float64)
+        if values.size != n:
+            raise ValueError(f"批量功率测量应返回 {n} 个值，实际返回 {values.size} 个: {response!r}")
+        return values
         
-    def getSensorInfo(self):
-        """获取当前连接的传感器的信息。"""
-        info_str = self.inst.query("SYST:SENS:IDN?").strip()
-        parts = info_str.split(',')
-        return {
-            'name': parts[0],
-            'serial_number': parts[1],
-            'calibration_message': parts[2],
-            'type': parts[3],
-            'subtype': parts[4],
-            'flags': parts[5]
-        }
+    @_serialized
+    def getSensorInfo(self, refresh=False):
+        """
+        获取当前连接的传感器的信息。
+        传感器信息在连接期间不变，首次查询后缓存；更换传感器后传入 refresh=True 重新查询。
+        返回缓存的副本，调用方修改返回值不影响缓存。
+        """
+        if self._sensor_info is None or refresh:
+            info_str = self.inst.query("SYST:SENS:IDN?").strip()
+            parts = info_str.split(',', 5)
+            self._sensor_info = {
+                'name': parts[0],
+                'serial_number': parts[1],
+                'calibration_message': parts[2],
+                'type': parts[3],
+                'subtype': parts[4],
+                'flags': parts[5]
+            }
+        return dict(self._sensor_info)
         
+    @_serialized
     def zero(self):
         """执行一次清零/背景校准。请确保在执行前遮挡传感器。"""
-        print("正在执行清零操作，请稍候...")
+        log.info("正在执行清零操作，请稍候...")
         # 清零命令会阻塞直到完成，可能需要增加超时时间
         default_timeout = self.inst.timeout
         self.inst.timeout = 10000 # 临时增加超时到 10 秒
@@ -154,21 +396,71 @@ class PM100D:
             # 在某些 VISA 实现中，可能需要等待操作完成
             # 使用 *OPC? 查询操作是否完成
             self.inst.query("*OPC?") 
-            print("清零完成。")
+            log.info("清零完成。")
         finally:
             self.inst.timeout = default_timeout # 恢复原始超时
 
+    @_serialized
     def write(self, message, q=False):
         """
         底层的写/查询封装。
         如果 q=True，则执行 query 操作，否则执行 write 操作。
         """
+        message = str(message)
+        # 直接发送的 CONF/MEAS 命令可能改变测量配置，下次 getPower 重新配置
+        command = message.upper()
+        if "CONF" in command or "MEAS" in command:
+            self._power_configured = False
+        # 直接发送的设置命令绕过了缓存，相应设置项下次 set* 时必须写入
+        if not q:
+            if "WAV" in command:
+                self._dirty.add('wavelength')
+            if "LPAS" in command:
+                self._dirty.add('bandwidth')
+            if "AVER" in command:
+                self._dirty.add('avg_count')
         if q:
-            return self.inst.query(str(message))
+            return self.inst.query(message)
         else:
-            self.inst.write(str(message))
+            self.inst.write(message)
+
+    async def _arun(self, func, *args):
+        """在线程中执行阻塞的 I/O 方法（方法自身持有 I/O 锁），等待期间事件循环可处理其他仪器的请求。"""
+        return await asyncio.to_thread(func, *args)
+
+    async def aquery(self, msg):
+        """query 的协程版本。"""
+        return await self._arun(self.write, msg, True)
+
+    async def awrite(self, msg):
+        """write 的协程版本。"""
+        return await self._arun(self.write, msg)
+
+    async def agetPower(self):
+        """getPower 的协程版本。"""
+        return await self._arun(self.getPower)
+
+    async def agetPowerBatch(self, n):
+        """getPowerBatch 的协程版本。"""
+        return await self._arun(self.getPowerBatch, n)
+
+    async def asetWavelength(self, nm=1550):
+        """setWavelength 的协程版本。"""
+        return await self._arun(self.setWavelength, nm)
+
+    async def asetBandwidth(self, name="LO"):
+        """setBandwidth 的协程版本。"""
+        return await self._arun(self.setBandwidth, name)
+
+    async def asetAvgCount(self, count=10):
+        """setAvgCount 的协程版本。"""
+        return await self._arun(self.setAvgCount, count)
 
+    @_serialized
     def close(self):
-        """关闭与仪器的连接。"""
-        self.inst.close()
-        print("PM100D 连接已关闭。")
+        """释放与仪器的连接，会话归还 VisaPool，再次连接同一设备时直接复用。"""
+        if self._closed:
+            return
+        self._closed = True
+        VisaPool.release(self.inst)
+        log.info("PM100D 连接已关闭。")
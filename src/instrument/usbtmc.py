@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Linux 内核 usbtmc 驱动访问
+通过 /dev/usbtmcN 设备文件直接读写仪器，USB 批量传输由内核完成，
+不经过 Python 实现的 USBTMC 协议层；对象接口与 PM100D 用到的 pyVISA 资源方法一致
+"""
+
+import glob
+import os
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# linux/usb/tmc.h 中的 ioctl 命令号
+_USBTMC_IOCTL_CLEAR = 0x5B02        # _IO(USBTMC_IOC_NR, 2)
+_USBTMC_IOCTL_SET_TIMEOUT = 0x40045B0A  # _IOW(USBTMC_IOC_NR, 10, __u32)
+
+DEVICE_PREFIX = "/dev/usbtmc"
+
+
+def is_usbtmc_path(addr) -> bool:
+    """资源地址是否为内核 usbtmc 设备文件"""
+    return isinstance(addr, str) and addr.startswith(DEVICE_PREFIX)
+
+
+def list_usbtmc_devices():
+    """列出系统中的 usbtmc 设备文件（非 Linux 或未加载驱动时为空列表）"""
+    return sorted(glob.glob(DEVICE_PREFIX + "[0-9]*"))
+
+
+class UsbtmcResource:
+    """
+    /dev/usbtmcN 设备文件的资源对象
+    
+    提供 write/read/query/clear/close 以及 timeout、chunk_size、
+    read_termination、write_termination、resource_name 属性，可替代 pyVISA 资源对象
+    """
+    
+    def __init__(self, path: str):
+        """
+        打开设备文件
+        
+        参数:
+            path (str): 设备文件路径，例如 '/dev/usbtmc0'
+        """
+        self.resource_name = path
+        self.chunk_size = 4096
+        self.read_termination = '\n'
+        self.write_termination = '\n'
+        self._fd = os.open(path, os.O_RDWR)
+        self._timeout = None
+        self.timeout = 3000
+    
+    @property
+    def timeout(self):
+        """读写超时（毫秒）"""
+        return self._timeout
+    
+    @timeout.setter
+    def timeout(self, value):
+        self._timeout = value
+        if FCNTL_AVAILABLE and value is not None:
+            try:
+                fcntl.ioctl(self._fd, _USBTMC_IOCTL_SET_TIMEOUT, int(value).to_bytes(4, 'little'))
+            except OSError:
+                # 较旧的内核不支持设置超时，使用驱动默认值
+                pass
+    
+    def write(self, message: str):
+        """发送一条命令"""
+        os.write(self._fd, (message + self.write_termination).encode('ascii'))
+    
+    def read(self) -> str:
+        """读取一条完整响应（读到结束符或设备不再返回数据为止），返回时去掉结束符"""
+        termination = self.read_termination.encode('ascii')
+        chunks = []
+        while True:
+            chunk = os.read(self._fd, self.chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if termination and chunk.endswith(termination):
+                break
+        response = b''.join(chunks).decode('ascii')
+        if self.read_termination and response.endswith(self.read_termination):
+            response = response[:-len(self.read_termination)]
+        return response
+    
+    def query(self, message: str) -> str:
+        """发送查询命令并返回响应"""
+        self.write(message)
+        return self.read()
+    
+    def clear(self):
+        """清除设备的输入输出缓冲"""
+        if FCNTL_AVAILABLE:
+            fcntl.ioctl(self._fd, _USBTMC_IOCTL_CLEAR)
+    
+    def close(self):
+        """关闭设备文件"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -3,17 +3,63 @@
 """
 设备连接缓存管理器
 用于保存和加载之前成功连接的设备信息，提升设备连接速度
+修改只更新内存并标记待保存，由定时器合并写盘，程序退出时自动保存
 """
 
+import atexit
+import heapq
 import json
+import logging
+import mmap
 import os
+import threading
 import time
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+# 优先级评分中“最近连接”的时间窗口（秒）
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+def _dumps(data: Dict) -> bytes:
+    """序列化为UTF-8编码的JSON（安装了orjson时使用orjson，格式与json模块输出一致）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Dict:
+    """解析UTF-8编码的JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def _load_file(file_path: str) -> Dict:
+    """读取并解析JSON文件（安装了orjson时直接解析文件映射，不额外复制文件内容）"""
+    with open(file_path, 'rb') as f:
+        if not ORJSON_AVAILABLE or os.fstat(f.fileno()).st_size == 0:
+            return _loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
 
 class DeviceCache:
     """设备缓存管理类"""
     
+    FLUSH_DELAY = 2.0  # 修改后延迟写盘的时间（秒），期间的多次修改合并为一次写入
+    MAX_DEVICES = 100  # 缓存设备数上限，超出时移除最久未连接的设备
+    
     def __init__(self, cache_file: str = "device_cache.json"):
         """
         初始化设备缓存管理器
@@ -23,11 +69,21 @@ class DeviceCache:
         """
         self.cache_file = cache_file
         self.cache_data = self._load_cache()
+        self._build_index()
+        
+        # 写回缓存状态：cache_data 的修改和序列化都在锁内进行
+        self._lock = threading.RLock()
+        # 写盘锁：覆盖序列化、写临时文件和替换的全过程，同一时间只有一次写盘
+        # （获取顺序：先 _write_lock 后 _lock）
+        self._write_lock = threading.RLock()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
         
     def _load_cache(self) -> Dict:
         """从文件加载缓存数据"""
         if not os.path.exists(self.cache_file):
-            print(f"缓存文件 {self.cache_file} 不存在，创建新的缓存")
+            log.info("缓存文件 %s 不存在，创建新的缓存", self.cache_file)
             return {
                 "devices": [],
                 "last_updated": None,
@@ -35,32 +91,121 @@ class DeviceCache:
             }
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                print(f"成功加载缓存文件，包含 {len(data.get('devices', []))} 个设备")
-                return data
+            data = _load_file(self.cache_file)
+            log.info("成功加载缓存文件，包含 %d 个设备", len(data.get('devices', [])))
+            return data
         except Exception as e:
-            print(f"加载缓存文件失败: {e}")
+            log.warning("加载缓存文件失败: %s", e)
             return {
                 "devices": [],
                 "last_updated": None,
                 "version": "1.0"
             }
     
+    def _build_index(self):
+        """建立资源地址 -> 设备信息的索引（与 cache_data["devices"] 共享同一批字典）及统计量"""
+        self._by_resource = {}
+        for device in self.cache_data["devices"]:
+            # 旧版本会把临时的优先级分数写入缓存文件，加载时去掉
+            device.pop("priority_score", None)
+            self._by_resource[device["resource"]] = device
+        self._rebuild_stats()
+    
+    def _rebuild_stats(self):
+        """重新计算统计量：成功率之和、连接次数最多的设备（之后随修改增量更新）"""
+        devices = self.cache_data["devices"]
+        self._sum_success_rate = sum(d.get("success_rate", 0) for d in devices)
+        self._most_used = max(devices, key=lambda x: x.get("connection_count", 0)) if devices else None
+    
+    def _note_connection_count(self, device: Dict):
+        """设备连接次数增加后更新连接次数最多的设备"""
+        if (self._most_used is None or
+                device.get("connection_count", 0) > self._most_used.get("connection_count", 0)):
+            self._most_used = device
+    
+    def _evict_oldest(self):
+        """设备数超过上限时移除最久未连接的设备"""
+        while len(self.cache_data["devices"]) > self.MAX_DEVICES:
+            oldest = min(self.cache_data["devices"], key=lambda x: x.get("last_connected", 0))
+            log.info("缓存设备数超过上限，移除最久未连接的设备: %s", oldest['resource'])
+            self._remove(oldest["resource"])
+    
+    def _remove(self, resource: str) -> bool:
+        """从设备列表、索引和统计量中移除设备（调用方须持有锁）"""
+        device = self._by_resource.pop(resource, None)
+        if device is None:
+            return False
+        
+        self.cache_data["devices"] = [
+            d for d in self.cache_data["devices"] if d is not device
+        ]
+        self._sum_success_rate -= device.get("success_rate", 0)
+        if device is self._most_used:
+            self._rebuild_stats()
+        return True
+    
     def _save_cache(self) -> bool:
         """保存缓存数据到文件"""
-        try:
-            # 更新最后修改时间
-            self.cache_data["last_updated"] = time.time()
-            
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"缓存已保存到 {self.cache_file}")
-            return True
-        except Exception as e:
-            print(f"保存缓存文件失败: {e}")
-            return False
+        with self._write_lock:
+            try:
+                with self._lock:
+                    # 更新最后修改时间
+                    self.cache_data["last_updated"] = time.time()
+                    raw = _dumps(self.cache_data)
+                    self._dirty = False
+                
+                # 先写临时文件再原子替换，写入中途失败不会损坏原缓存文件
+                tmp_file = self.cache_file + ".tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(raw)
+                os.replace(tmp_file, self.cache_file)
+                
+                log.debug("缓存已保存到 %s", self.cache_file)
+                return True
+            except Exception as e:
+                log.warning("保存缓存文件失败: %s", e)
+                with self._lock:
+                    self._dirty = True
+                return False
+    
+    def _mark_dirty(self) -> bool:
+        """
+        标记缓存待保存，FLUSH_DELAY 秒后由定时器统一写盘
+        
+        Returns:
+            bool: 始终为True（内存中的修改已生效）
+        """
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.FLUSH_DELAY, self._on_flush_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return True
+    
+    def _on_flush_timer(self):
+        """定时器回调：写入期间累积的修改"""
+        with self._lock:
+            self._flush_timer = None
+        self.flush()
+    
+    def flush(self) -> bool:
+        """
+        立即保存未写盘的修改；定时器线程正在写盘时等待其完成
+        
+        Returns:
+            bool: 没有待保存的修改或保存成功时为True
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return True
+            return self._save_cache()
     
     def add_device(self, resource: str, idn: str, additional_info: Optional[Dict] = None) -> bool:
         """
@@ -74,32 +219,39 @@ class DeviceCache:
         Returns:
             bool: 是否成功添加
         """
-        # 检查设备是否已存在
-        for device in self.cache_data["devices"]:
-            if device["resource"] == resource:
+        with self._lock:
+            # 检查设备是否已存在
+            device = self._by_resource.get(resource)
+            if device is not None:
                 # 更新现有设备信息
                 device["idn"] = idn
                 device["last_connected"] = time.time()
                 device["connection_count"] = device.get("connection_count", 0) + 1
                 if additional_info:
                     device["additional_info"] = additional_info
-                print(f"更新缓存中的设备: {resource}")
-                return self._save_cache()
-        
-        # 添加新设备
-        device_info = {
-            "resource": resource,
-            "idn": idn,
-            "first_connected": time.time(),
-            "last_connected": time.time(),
-            "connection_count": 1,
-            "success_rate": 1.0,  # 成功连接率
-            "additional_info": additional_info or {}
-        }
-        
-        self.cache_data["devices"].append(device_info)
-        print(f"添加新设备到缓存: {resource}")
-        return self._save_cache()
+                self._note_connection_count(device)
+                log.debug("更新缓存中的设备: %s", resource)
+                return self._mark_dirty()
+            
+            # 添加新设备
+            now = time.time()
+            device_info = {
+                "resource": resource,
+                "idn": idn,
+                "first_connected": now,
+                "last_connected": now,
+                "connection_count": 1,
+                "success_rate": 1.0,  # 成功连接率
+                "additional_info": additional_info or {}
+            }
+            
+            self.cache_data["devices"].append(device_info)
+            self._by_resource[resource] = device_info
+            self._sum_success_rate += device_info["success_rate"]
+            self._note_connection_count(device_info)
+            log.debug("添加新设备到缓存: %s", resource)
+            self._evict_oldest()
+            return self._mark_dirty()
     
     def get_cached_devices(self) -> List[Dict]:
         """
@@ -109,10 +261,9 @@ class DeviceCache:
         Returns:
             List[Dict]: 缓存的设备列表
         """
-        devices = self.cache_data.get("devices", []).copy()
-        # 按最近连接时间排序
-        devices.sort(key=lambda x: x.get("last_connected", 0), reverse=True)
-        return devices
+        # 按最近连接时间排序（sorted 本身生成新列表，无需先复制）
+        return sorted(self.cache_data.get("devices", []),
+                      key=lambda x: x.get("last_connected", 0), reverse=True)
     
     def get_priority_devices(self, limit: int = 5) -> List[Dict]:
         """
@@ -124,23 +275,25 @@ class DeviceCache:
         Returns:
             List[Dict]: 优先设备列表
         """
-        devices = self.cache_data.get("devices", []).copy()
+        devices = self.cache_data.get("devices", [])
+        n = len(devices)
         
-        # 计算优先级分数：连接次数 * 成功率 + 最近连接时间权重
+        # 计算优先级分数：连接次数 * 成功率 + 最近连接时间权重（整列向量化计算）
         current_time = time.time()
-        for device in devices:
-            last_connected = device.get("last_connected", 0)
-            connection_count = device.get("connection_count", 1)
-            success_rate = device.get("success_rate", 1.0)
-            
-            # 时间权重：最近7天内连接过的设备加分
-            time_weight = 1.0 if (current_time - last_connected) < 7 * 24 * 3600 else 0.5
-            
-            device["priority_score"] = connection_count * success_rate * time_weight
+        last_connected = np.fromiter((d.get("last_connected", 0) for d in devices), dtype=np.float64, count=n)
+        connection_count = np.fromiter((d.get("connection_count", 1) for d in devices), dtype=np.float64, count=n)
+        success_rate = np.fromiter((d.get("success_rate", 1.0) for d in devices), dtype=np.float64, count=n)
+        
+        # 时间权重：最近7天内连接过的设备加分（与持久化的连接时间比较，须使用墙上时间）
+        time_weight = np.where(current_time - last_connected < WEEK_SECONDS, 1.0, 0.5)
+        scores = connection_count * success_rate * time_weight
+        
+        # 分数只用于本次排序，不写回缓存中的设备信息
+        score_list = scores.tolist()
         
-        # 按优先级分数排序
-        devices.sort(key=lambda x: x.get("priority_score", 0), reverse=True)
-        return devices[:limit]
+        # 只选出分数最高的 limit 个（O(N log limit)），分数相同的保持原有顺序
+        top = heapq.nlargest(limit, range(n), key=score_list.__getitem__)
+        return [devices[i] for i in top]
     
     def update_connection_result(self, resource: str, success: bool) -> bool:
         """
@@ -153,26 +306,29 @@ class DeviceCache:
         Returns:
             bool: 是否成功更新
         """
-        for device in self.cache_data["devices"]:
-            if device["resource"] == resource:
-                if success:
-                    device["last_connected"] = time.time()
-                
-                # 更新成功率（使用简单的移动平均）
-                current_success_rate = device.get("success_rate", 1.0)
-                total_attempts = device.get("total_attempts", 1)
-                
-                if success:
-                    new_success_rate = (current_success_rate * total_attempts + 1) / (total_attempts + 1)
-                else:
-                    new_success_rate = (current_success_rate * total_attempts) / (total_attempts + 1)
-                
-                device["success_rate"] = max(new_success_rate, 0.01)  # 最低1%成功率
-                device["total_attempts"] = total_attempts + 1
-                
-                return self._save_cache()
-        
-        return False
+        with self._lock:
+            device = self._by_resource.get(resource)
+            if device is None:
+                return False
+            
+            if success:
+                device["last_connected"] = time.time()
+            
+            # 更新成功率（使用简单的移动平均）
+            current_success_rate = device.get("success_rate", 1.0)
+            total_attempts = device.get("total_attempts", 1)
+            
+            if success:
+                new_success_rate = (current_success_rate * total_attempts + 1) / (total_attempts + 1)
+            else:
+                new_success_rate = (current_success_rate * total_attempts) / (total_attempts + 1)
+            
+            new_success_rate = max(new_success_rate, 0.01)  # 最低1%成功率
+            self._sum_success_rate += new_success_rate - device.get("success_rate", 0)
+            device["success_rate"] = new_success_rate
+            device["total_attempts"] = total_attempts + 1
+            
+            return self._mark_dirty()
     
     def remove_device(self, resource: str) -> bool:
         """
@@ -184,17 +340,12 @@ class DeviceCache:
         Returns:
             bool: 是否成功移除
         """
-        original_count = len(self.cache_data["devices"])
-        self.cache_data["devices"] = [
-            device for device in self.cache_data["devices"] 
-            if device["resource"] != resource
-        ]
-        
-        if len(self.cache_data["devices"]) < original_count:
-            print(f"从缓存中移除设备: {resource}")
-            return self._save_cache()
-        
-        return False
+        with self._lock:
+            if not self._remove(resource):
+                return False
+            
+            log.debug("从缓存中移除设备: %s", resource)
+            return self._mark_dirty()
     
     def clear_cache(self) -> bool:
         """
@@ -203,23 +354,28 @@ class DeviceCache:
         Returns:
             bool: 是否成功清空
         """
-        self.cache_data = {
-            "devices": [],
-            "last_updated": time.time(),
-            "version": "1.0"
-        }
-        print("已清空设备缓存")
-        return self._save_cache()
+        with self._lock:
+            self.cache_data = {
+                "devices": [],
+                "last_updated": time.time(),
+                "version": "1.0"
+            }
+            self._by_resource = {}
+            self._rebuild_stats()
+            self._dirty = True
+        log.info("已清空设备缓存")
+        # 用户主动清空，立即写盘
+        return self.flush()
     
     def get_cache_stats(self) -> Dict:
         """
-        获取缓存统计信息
+        获取缓存统计信息（使用增量维护的统计量，O(1)）
         
         Returns:
             Dict: 缓存统计信息
         """
-        devices = self.cache_data.get("devices", [])
-        if not devices:
+        total_devices = len(self.cache_data.get("devices", []))
+        if not total_devices:
             return {
                 "total_devices": 0,
                 "last_updated": None,
@@ -227,15 +383,11 @@ class DeviceCache:
                 "most_used_device": None
             }
         
-        total_devices = len(devices)
-        avg_success_rate = sum(d.get("success_rate", 0) for d in devices) / total_devices
-        most_used_device = max(devices, key=lambda x: x.get("connection_count", 0))
-        
         return {
             "total_devices": total_devices,
             "last_updated": self.cache_data.get("last_updated"),
-            "avg_success_rate": avg_success_rate,
-            "most_used_device": most_used_device["resource"]
+            "avg_success_rate": self._sum_success_rate / total_devices,
+            "most_used_device": self._most_used["resource"]
         }
     
     def export_cache(self, export_file: str) -> bool:
@@ -249,10 +401,12 @@ class DeviceCache:
             bool: 是否成功导出
         """
         try:
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, indent=2, ensure_ascii=False)
-            print(f"缓存已导出到 {export_file}")
+            with self._lock:
+                raw = _dumps(self.cache_data)
+            with open(export_file, 'wb') as f:
+                f.write(raw)
+            log.info("缓存已导出到 %s", export_file)
             return True
         except Exception as e:
-            print(f"导出缓存失败: {e}")
+            log.warning("导出缓存失败: %s", e)
             return False
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志过滤器
+用于限制高频重复日志（如设备每次采集都失败时的错误信息）的输出频率
+"""
+
+import logging
+import threading
+import time
+
+
+class RateLimitFilter(logging.Filter):
+    """重复日志限流过滤器：同一条消息在间隔时间内只输出一次"""
+    
+    def __init__(self, interval: float = 1.0, max_entries: int = 1000):
+        """
+        初始化限流过滤器
+        
+        Args:
+            interval: 相同消息的最短输出间隔（秒）
+            max_entries: 记录的消息数上限，超出时清理过期记录
+        """
+        super().__init__()
+        self.interval = interval
+        self.max_entries = max_entries
+        self._last_emit = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """返回False表示丢弃该条日志"""
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        
+        with self._lock:
+            last = self._last_emit.get(key)
+            if last is not None and now - last < self.interval:
+                return False
+            
+            self._last_emit[key] = now
+            if len(self._last_emit) > self.max_entries:
+                self._last_emit = {
+                    k: t for k, t in self._last_emit.items()
+                    if now - t < self.interval
+                }
+        
+        return True
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时采样数据记录器
+采集线程只负责把数据放入队列，由后台线程写入CSV文件，避免磁盘I/O影响采集节奏
+"""
+
+import csv
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class SampleLogger:
+    """实时采样数据记录类"""
+    
+    def __init__(self):
+        """初始化记录器（调用start后才开始写文件）"""
+        self.file_path: Optional[str] = None
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        # 写入线程出错退出时置位，此后的记录直接丢弃，避免队列无限增长
+        self._failed = threading.Event()
+    
+    def start(self, file_path: str):
+        """
+        启动后台写入线程
+        
+        Args:
+            file_path: CSV文件路径
+        """
+        if self.is_running():
+            self.stop()
+        
+        self.file_path = file_path
+        self._queue = queue.SimpleQueue()
+        self._failed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._write_loop,
+            args=(file_path, self._queue, self._failed),
+            name="SampleLogger",
+            daemon=True
+        )
+        self._thread.start()
+        log.info("实时记录已启动: %s", file_path)
+    
+    def log(self, timestamp: float, device_id: str, power: float):
+        """记录单个采样点（只入队，不阻塞调用方；写入线程已出错时丢弃）"""
+        if self._queue is not None and not self._failed.is_set():
+            self._queue.put((timestamp, device_id, power))
+    
+    def log_many(self, rows: Iterable[Tuple[float, str, float]]):
+        """批量记录采样点"""
+        if self._queue is not None and not self._failed.is_set():
+            for row in rows:
+                self._queue.put(row)
+    
+    def stop(self, timeout: float = 5.0):
+        """
+        停止后台写入线程，等待队列中剩余数据写完
+        
+        Args:
+            timeout: 等待线程结束的最长时间（秒）
+        """
+        if self._queue is None:
+            return
+        
+        self._queue.put(None)
+        self._thread.join(timeout)
+        log.info("实时记录已停止: %s", self.file_path)
+        
+        self._queue = None
+        self._thread = None
+    
+    def is_running(self) -> bool:
+        """记录线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    @staticmethod
+    def _write_loop(file_path: str, sample_queue: queue.SimpleQueue, failed: threading.Event):
+        """后台线程：从队列取出数据写入CSV，队列空闲时才刷新文件"""
+        try:
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['时间戳', '格式化时间', '设备', '功率(W)'])
+                
+                # 同一秒内的采样复用格式化好的时间字符串
+                last_sec = -1
+                last_sec_str = ""
+                
+                # 逐样本循环中用到的函数绑定为局部变量，省去每次的属性查找
+                get = sample_queue.get
+                empty = sample_queue.empty
+                writerow = writer.writerow
+                strftime = time.strftime
+                localtime = time.localtime
+                
+                while True:
+                    item = get()
+                    if item is None:
+                        break
+                    
+                    timestamp, device_id, power = item
+                    sec = int(timestamp)
+                    if sec != last_sec:
+                        last_sec = sec
+                        last_sec_str = strftime("%Y-%m-%d %H:%M:%S", localtime(sec))
+                    
+                    writerow([timestamp, last_sec_str, device_id, "%.6e" % power])
+                    
+                    if empty():
+                        f.flush()
+        
+        except OSError as e:
+            # 通知生产方停止入队；已在队列中的数据随队列一起释放
+            failed.set()
+            log.error("写入实时记录文件失败，实时记录已停止: %s", e)